@@ -6,6 +6,7 @@ import logging
 import subprocess
 import os
 import signal
+from sports_display.teams import team_options
 
 app = Flask(__name__)
 
@@ -55,6 +56,9 @@ def index():
         mode = "off"
     
     status = f"Display: {current_type}"
+    # team pickers come from the ESPN catalog as last fetched; the template
+    # falls back to its built-in lists until one has been
+    catalogs = {sport: team_options(sport) for sport in DEFAULT_TEAMS}
     return render_template(
         "index.html",
         nfl_teams=teams_data['nfl'],
@@ -62,6 +66,7 @@ def index():
         mlb_teams=teams_data['mlb'],
         ncaafb_teams=teams_data['ncaafb'],
         ncaabb_teams=teams_data['ncaabb'],
+        catalogs=catalogs,
         mode=mode,
         status=status
     )
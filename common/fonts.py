@@ -0,0 +1,121 @@
+from PIL import Image
+from rgbmatrix import graphics
+import logging
+import threading
+import time
+
+
+class BitmapFont:
+    # a BDF font rasterized for PIL, placing glyphs exactly where
+    # graphics.DrawText puts them so pre-composited layers match the panel
+
+    def __init__(self, path):
+        # codepoint -> (advance, x offset, y offset, mask or None)
+        self.glyphs = {}
+        glyph, rows = None, None
+        with open(path, 'r', encoding='latin-1') as f:
+            for line in f:
+                fields = line.split()
+                if not fields:
+                    continue
+                if fields[0] == 'ENCODING':
+                    glyph = {'code': int(fields[1])}
+                elif fields[0] == 'DWIDTH' and glyph is not None:
+                    glyph['advance'] = int(fields[1])
+                elif fields[0] == 'BBX' and glyph is not None:
+                    glyph['bbx'] = [int(value) for value in fields[1:5]]
+                elif fields[0] == 'BITMAP' and glyph is not None:
+                    rows = []
+                elif fields[0] == 'ENDCHAR' and glyph is not None:
+                    self._add(glyph, rows or [])
+                    glyph, rows = None, None
+                elif rows is not None:
+                    rows.append(fields[0])
+
+
+    def _add(self, glyph, rows):
+        width, height, x_offset, y_offset = glyph['bbx']
+        mask = None
+        if width and height:
+            mask = Image.new('1', (width, height))
+            pixels = []
+            for row in rows[:height]:
+                bits = int(row, 16)
+                size = len(row) * 4
+                pixels.extend(255 if bits >> (size - 1 - x) & 1 else 0 for x in range(width))
+            pixels.extend([0] * (width * height - len(pixels)))
+            mask.putdata(pixels)
+        self.glyphs[glyph['code']] = (glyph.get('advance', width), x_offset, y_offset, mask)
+
+
+    def width(self, text):
+        return sum(self.glyphs[ord(char)][0] for char in text if ord(char) in self.glyphs)
+
+
+    def draw(self, image, x, y, color, text):
+        # y is the baseline, as with graphics.DrawText; returns the advance
+        start = x
+        for char in text:
+            glyph = self.glyphs.get(ord(char))
+            if glyph is None:
+                continue
+            advance, x_offset, y_offset, mask = glyph
+            if mask is not None:
+                image.paste(color, (int(x) + x_offset, int(y) - y_offset - mask.size[1]), mask)
+            x += advance
+        return x - start
+
+
+class FontRegistry:
+    # one parsed graphics.Font per BDF path, shared by every renderer in the
+    # process; parsing happens once, at preload or on first use
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fonts = {}
+        self._bitmaps = {}
+        # path -> {'loads', 'seconds', 'uses'}
+        self._stats = {}
+
+
+    def _load(self, fonts, path, load):
+        with self._lock:
+            font = fonts.get(path)
+            if font is None:
+                start = time.perf_counter()
+                font = load(path)
+                elapsed = time.perf_counter() - start
+                fonts[path] = font
+                stats = self._stats.setdefault(path, {'loads': 0, 'seconds': 0.0, 'uses': 0})
+                stats['loads'] += 1
+                stats['seconds'] += elapsed
+                logging.info(f"Loaded font {path} in {elapsed * 1000:.1f} ms")
+            self._stats[path]['uses'] += 1
+            return font
+
+
+    def get(self, path):
+        # the graphics.Font for drawing straight onto a canvas
+        def load(path):
+            font = graphics.Font()
+            font.LoadFont(path)
+            return font
+        return self._load(self._fonts, path, load)
+
+
+    def bitmap(self, path):
+        # the same font as a BitmapFont, for composing PIL images
+        return self._load(self._bitmaps, path, BitmapFont)
+
+
+    def preload(self, paths):
+        for path in paths:
+            self.get(path)
+
+
+    def stats(self):
+        with self._lock:
+            return {path: dict(stats) for path, stats in self._stats.items()}
+
+
+fonts = FontRegistry()
@@ -0,0 +1,36 @@
+import threading
+
+
+class FrameGate:
+    # remembers a key for the logical content of the frame on the panel; a
+    # render whose key matches it is skipped, with no clear, draw or swap
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.key = None
+        self.drawn = 0
+        self.skipped = 0
+
+
+    def render(self, key, draw):
+        # run draw() unless the panel already shows key; True if it drew
+        with self._lock:
+            if key is not None and key == self.key:
+                self.skipped += 1
+                return False
+        draw()
+        with self._lock:
+            self.key = key
+            self.drawn += 1
+        return True
+
+
+    def invalidate(self):
+        # something drew around the gate; the next render always draws
+        with self._lock:
+            self.key = None
+
+
+    def stats(self):
+        with self._lock:
+            return {'drawn': self.drawn, 'skipped': self.skipped}
@@ -0,0 +1,336 @@
+from collections import OrderedDict
+from PIL import Image, ImageDraw
+from rgbmatrix import graphics
+from common.fonts import fonts
+import threading
+
+
+PANEL_SIZE = (128, 32)
+
+WHITE = (255, 255, 255)
+
+# backgrounds kept by StaticLayers; one per screen on show plus the
+# variants a live football game goes through as possession changes
+BACKGROUND_SLOTS = 16
+
+
+class Text:
+    # a string with its baseline at y; x is where it starts ('left'), its
+    # middle ('center') or where it ends ('right'). field names the value to
+    # draw (through fmt if given), text is a fixed string; color is an RGB
+    # tuple or the name of a value holding one. Static elements are drawn
+    # into the cached background, when names a value that must be true
+
+    def __init__(self, font, x, y, field=None, text=None, fmt=None, color=WHITE, align='left',
+                 static=False, when=None):
+        self.font = font
+        self.x = x
+        self.y = y
+        self.field = field
+        self.text = text
+        self.fmt = fmt
+        self.color = color
+        self.align = align
+        self.static = static
+        self.when = when
+
+
+class Picture:
+    # an image value, e.g. a logo, pasted with its top left at x, y
+
+    def __init__(self, field, x, y, static=True):
+        self.field = field
+        self.x = x
+        self.y = y
+        self.static = static
+        self.when = None
+
+
+class Box:
+    # rectangle outline from (x0, y0) to (x1, y1)
+
+    def __init__(self, x0, y0, x1, y1, color, static=False, when=None):
+        self.corners = (x0, y0, x1, y1)
+        self.color = color
+        self.static = static
+        self.when = when
+
+
+class Dots:
+    # single pixels
+
+    def __init__(self, points, color, static=False, when=None):
+        self.points = points
+        self.color = color
+        self.static = static
+        self.when = when
+
+
+class Rows:
+    # elements repeated for every item of a list value, each item a dict of
+    # values and each row step pixels below the previous one
+
+    def __init__(self, field, step, elements, static=False):
+        self.field = field
+        self.step = step
+        self.elements = elements
+        self.static = static
+        self.when = None
+
+
+class Layout:
+    # a screen declared once as a list of elements, compiled on first use
+
+    def __init__(self, name, elements):
+        self.name = name
+        self.elements = elements
+
+
+class _Same:
+    # an image in a key: equal only to itself, and kept alive by the key so
+    # its id can't be reused while the key is cached
+
+    __slots__ = ('image',)
+
+    def __init__(self, image):
+        self.image = image
+
+
+    def __eq__(self, other):
+        return isinstance(other, _Same) and other.image is self.image
+
+
+    def __hash__(self):
+        return id(self.image)
+
+
+def _freeze(value):
+    if isinstance(value, Image.Image):
+        return _Same(value)
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in sorted(value.items()))
+    return value
+
+
+class RenderPlan:
+    # a layout resolved against its fonts: every fixed position, width and
+    # color computed once. draw() replays the dynamic part onto a canvas,
+    # compose() the static part into a PIL image
+
+    def __init__(self, layout):
+        self.name = layout.name
+        # the values a frame depends on, and the subset its background does
+        self.fields = []
+        self.static_fields = []
+        self.static = []
+        self.dynamic = []
+        for element in layout.elements:
+            self._add(element)
+
+
+    def _add(self, element):
+        fields = self.static_fields if element.static else self.fields
+        for name in self._fields(element):
+            if name not in fields:
+                fields.append(name)
+            if name not in self.fields:
+                self.fields.append(name)
+        ops = self.static if element.static else self.dynamic
+        ops.append(self._compile(element))
+
+
+    def _fields(self, element):
+        names = [element.when] if element.when else []
+        if isinstance(element, Text):
+            names += [name for name in (element.field,) if name]
+            names += [element.color] if isinstance(element.color, str) else []
+        elif isinstance(element, (Picture, Rows)):
+            names.append(element.field)
+        return names
+
+
+    def _compile(self, element):
+        if isinstance(element, Text):
+            return self._text(element)
+        if isinstance(element, Picture):
+            def picture(target, values, dy=0):
+                image = values.get(element.field)
+                if image is None:
+                    return
+                if isinstance(target, Image.Image):
+                    target.paste(image, (element.x, element.y + dy))
+                else:
+                    target.SetImage(image, element.x, element.y + dy)
+            return picture
+        if isinstance(element, Box):
+            return self._box(element)
+        if isinstance(element, Dots):
+            return self._dots(element)
+        if isinstance(element, Rows):
+            ops = [self._compile(child) for child in element.elements]
+            def rows(target, values, dy=0):
+                for index, row in enumerate(values.get(element.field) or []):
+                    for op in ops:
+                        op(target, row, dy + index * element.step)
+            return rows
+        raise TypeError(f"Unknown layout element {element!r}")
+
+
+    def _text(self, element):
+        canvas_font = None if element.static else fonts.get(element.font)
+        bitmap = fonts.bitmap(element.font)
+        # fixed-width fonts (all of rpi-rgb-led-matrix's) measure by length
+        advances = {glyph[0] for glyph in bitmap.glyphs.values()}
+        advance = advances.pop() if len(advances) == 1 else None
+        offset = {'left': 0, 'center': 2, 'right': 1}[element.align]
+
+        def place(text):
+            if not offset:
+                return element.x
+            width = len(text) * advance if advance else bitmap.width(text)
+            return element.x - width // offset
+
+        # graphics.Color objects for fixed colors are made here, once;
+        # colors from values are made once per distinct color
+        colors = {}
+        def rgb(values):
+            return (values.get(element.color) if isinstance(element.color, str) else element.color) or WHITE
+
+        def color(values):
+            key = rgb(values)
+            if key not in colors:
+                colors[key] = graphics.Color(*key)
+            return colors[key]
+        if not element.static:
+            color({})
+
+        def text(target, values, dy=0):
+            if element.when and not values.get(element.when):
+                return
+            if element.text is not None:
+                value = element.text
+            else:
+                value = values.get(element.field)
+                if value is None:
+                    return
+                value = element.fmt.format(value) if element.fmt else str(value)
+            if not value:
+                return
+            if isinstance(target, Image.Image):
+                bitmap.draw(target, place(value), element.y + dy, rgb(values), value)
+            else:
+                graphics.DrawText(target, canvas_font, place(value), element.y + dy, color(values), value)
+        return text
+
+
+    def _box(self, element):
+        x0, y0, x1, y1 = element.corners
+        color = None if element.static else graphics.Color(*element.color)
+
+        def box(target, values, dy=0):
+            if element.when and not values.get(element.when):
+                return
+            if isinstance(target, Image.Image):
+                ImageDraw.Draw(target).rectangle((x0, y0 + dy, x1, y1 + dy), outline=element.color)
+                return
+            graphics.DrawLine(target, x0, y0 + dy, x1, y0 + dy, color)
+            graphics.DrawLine(target, x0, y1 + dy, x1, y1 + dy, color)
+            graphics.DrawLine(target, x0, y0 + dy, x0, y1 + dy, color)
+            graphics.DrawLine(target, x1, y0 + dy, x1, y1 + dy, color)
+        return box
+
+
+    def _dots(self, element):
+        def dots(target, values, dy=0):
+            if element.when and not values.get(element.when):
+                return
+            for x, y in element.points:
+                if isinstance(target, Image.Image):
+                    target.putpixel((x, y + dy), element.color)
+                else:
+                    target.SetPixel(x, y + dy, *element.color)
+        return dots
+
+
+    def key(self, values):
+        # equal keys mean identical frames
+        return (self.name,) + tuple(_freeze(values.get(name)) for name in self.fields)
+
+
+    def static_key(self, values):
+        return (self.name,) + tuple(_freeze(values.get(name)) for name in self.static_fields)
+
+
+    def compose(self, values):
+        image = Image.new("RGB", PANEL_SIZE)
+        for op in self.static:
+            op(image, values)
+        return image
+
+
+    def image(self, values):
+        # the whole frame as a PIL image, e.g. to keep it across restarts
+        image = self.compose(values)
+        for op in self.dynamic:
+            op(image, values)
+        return image
+
+
+    def draw(self, canvas, values):
+        for op in self.dynamic:
+            op(canvas, values)
+
+
+    def paint(self, canvas, values, layers):
+        # the cached background in one blit when there is one (it covers the
+        # whole panel, so no Clear() first), then the dynamic elements
+        if self.static:
+            canvas.SetImage(layers.get(self, values), 0, 0)
+        else:
+            canvas.Clear()
+        self.draw(canvas, values)
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+def compile_layout(layout):
+    # plans are compiled once per layout and shared
+    with _plans_lock:
+        plan = _plans.get(layout)
+        if plan is None:
+            plan = RenderPlan(layout)
+            _plans[layout] = plan
+        return plan
+
+
+class StaticLayers:
+    # composed backgrounds in a small LRU keyed by the static values they
+    # were drawn from
+
+    def __init__(self, slots=BACKGROUND_SLOTS):
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._layers = OrderedDict()
+        self.built = 0
+
+
+    def get(self, plan, values):
+        key = plan.static_key(values)
+        with self._lock:
+            layer = self._layers.get(key)
+            if layer is not None:
+                self._layers.move_to_end(key)
+                return layer
+
+        layer = plan.compose(values)
+        with self._lock:
+            self._layers[key] = layer
+            self._layers.move_to_end(key)
+            while len(self._layers) > self.slots:
+                self._layers.popitem(last=False)
+            self.built += 1
+        return layer
@@ -14,14 +14,22 @@
 # You should have received a copy of the GNU General Public License along
 # with this program; if not, write to the Free Software Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
-from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
+import os
+import sys
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rgbmatrix import RGBMatrix, RGBMatrixOptions
+from common.fonts import fonts
+from common.frames import FrameGate
+from common.layouts import Layout, Text, Rows, compile_layout
 from flask import Flask, jsonify, request, current_app
 from multiprocessing import Process, Pipe
 from multiprocessing.sharedctypes import Value
 import ctypes
 import traceback
 import time
-import sys
 import requests
 import json
 import logging
@@ -35,6 +43,16 @@ app = Flask(__name__)
 stations_file = None
 lines_file = None
 
+# what the train board currently shows; redraws of the same times are skipped
+frames = FrameGate()
+
+# train board layouts by font file
+boards = {}
+
+RED = (255, 0, 0)
+YELLOW = (200, 125, 0)
+GREEN = (50, 150, 0)
+
 def exception_hook(exctype, value, tb):
     logging.error("Uncaught exception!")
     logging.error('Type: {}'.format(exctype))
@@ -77,6 +95,10 @@ def run_display(api_key, station_code_receiver, direction_receiver, font_file):
     direction = direction_receiver.recv()
     incidents_check_count = 0
     canvas = init_matrix()
+    # parse the font and compile the board once for this process, before
+    # the first frame
+    fonts.preload([font_file])
+    compile_layout(board_layout(font_file))
     logging.info("RUNNING PROGRAM")
 
     prev_lines = []
@@ -102,6 +124,9 @@ def run_display(api_key, station_code_receiver, direction_receiver, font_file):
             for incident in incidents:
                 logging.info("Calling draw_incident for: {}".format(incident))
                 draw_incident(canvas, font_file, incident)
+                # the incident drew over the train board
+                frames.invalidate()
+            logging.debug("Frames: {}".format(frames.stats()))
             incidents_check_count = 0
 
         prev_lines, prev_cars, prev_dests, prev_times = show_train_times(api_key, font_file, canvas, station_code, direction, prev_lines, prev_cars, prev_dests, prev_times, force_update)
@@ -198,48 +223,41 @@ def get_train_data(api_key, station_code, direction):
 
     return lines, cars, dests, times
 
-def draw_display(canvas, font_file, lines, cars, dests, mins):
-    height_delta = 8
-    width_delta = 6
-
-    total_width = 128
-
-    font = graphics.Font()
-    font.LoadFont(font_file)
-    red_color = graphics.Color(255,0,0)
-    yellow_color = graphics.Color(200,125,0)
-    green_color = graphics.Color(50,150,0)
-
-    canvas.Clear()
-    graphics.DrawText(canvas, font, 0, 7, red_color, "LN CAR  DEST")
-    graphics.DrawText(canvas, font, 111, 7, red_color, "MIN")
-
-    i = 0
-    for line in lines:
-        graphics.DrawText(canvas, font, 0, 15 + i*height_delta, yellow_color, line)
-        i += 1
-
-    i = 0
-    for car in cars:
+def board_layout(font_file):
+    # the train board, declared once per font
+    layout = boards.get(font_file)
+    if layout is None:
+        layout = Layout('train board', [
+            Text(font_file, 0, 7, text="LN CAR  DEST", color=RED),
+            Text(font_file, 111, 7, text="MIN", color=RED),
+            Rows('trains', 8, [
+                Text(font_file, 0, 15, 'line', color=YELLOW),
+                Text(font_file, 20, 15, 'car', color='car_color'),
+                Text(font_file, 28, 15, 'passenger', color=YELLOW),
+                Text(font_file, 40, 15, 'dest', color=YELLOW),
+                # right-aligned, plus one for the space at the end of each glyph
+                Text(font_file, 129, 15, 'min', color=YELLOW, align='right'),
+            ]),
+        ])
+        boards[font_file] = layout
+    return layout
+
+def train_rows(lines, cars, dests, mins):
+    rows = []
+    for line, car, dest, time in zip(lines, cars, dests, mins):
+        row = {'line': line, 'car': car, 'car_color': YELLOW, 'dest': dest, 'min': time}
         # Handle case for No Passenger trains
-        if lines[i] == "No" and car == "":
-            graphics.DrawText(canvas, font, 28, 15 + i*height_delta, yellow_color, "Pa")
+        if line == "No" and car == "":
+            row['passenger'] = "Pa"
         elif car == "8": # 8 car trains are green
-            graphics.DrawText(canvas, font, 20, 15 + i*height_delta, green_color, car)
-        else:
-            graphics.DrawText(canvas, font, 20, 15 + i*height_delta, yellow_color, car)
-        i += 1
-
-    i = 0
-    for dest in dests:
-        graphics.DrawText(canvas, font, 40, 15 + i*height_delta, yellow_color, dest)
-        i += 1
-
-    i = 0
-    for time in mins:
-        x = total_width - len(time)*width_delta + 1 # Add one to account for space at end
-        graphics.DrawText(canvas, font, x, 15 + i*height_delta, yellow_color, time)
-        i += 1
+            row['car_color'] = GREEN
+        rows.append(row)
+    return rows
+
+def draw_display(canvas, font_file, lines, cars, dests, mins):
+    plan = compile_layout(board_layout(font_file))
+    values = {'trains': train_rows(lines, cars, dests, mins)}
+    frames.render(plan.key(values), lambda: plan.paint(canvas, values, None))
 
 def parse_value(value):
     return value if value != None else ""
@@ -14,10 +14,16 @@
 # You should have received a copy of the GNU General Public License along
 # with this program; if not, write to the Free Software Foundation, Inc.,
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+import os
+import sys
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import traceback
 from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
+from common.fonts import fonts
 import time
-import sys
 import requests
 import logging
 
@@ -112,8 +118,7 @@ def split_by_length_in_place(words):
 
 def draw_message(canvas, message, font_file):
     logging.info("Got to draw message")
-    font = graphics.Font()
-    font.LoadFont(font_file)
+    font = fonts.get(font_file)
     red_color = graphics.Color(255,0,0)
     yellow_color = graphics.Color(200,125,0)
     title_divided = message.split(': ', 1)
@@ -168,8 +173,7 @@ def draw_incident(canvas, font_file, message):
 
     total_width = 128
 
-    font = graphics.Font()
-    font.LoadFont(font_file)
+    font = fonts.get(font_file)
     red_color = graphics.Color(255,0,0)
     yellow_color = graphics.Color(200,125,0)
     green_color = graphics.Color(50,150,0)
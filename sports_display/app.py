@@ -4,12 +4,30 @@ import os
 # Add parent directory to sys.path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask
-from sports_display.get_data import get_current_games, update_game
-from io import BytesIO
-from PIL import Image
-import requests
-from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
+from flask import Flask, jsonify, request
+from sports_display.get_data import get_current_games, update_games
+from sports_display.parse import Game
+from sports_display.schedule import DailySchedule, load_schedule, DONE_STATUSES
+from sports_display.leagues import in_season
+from sports_display.polling import PollScheduler
+from sports_display.clock import LiveClocks
+from sports_display.changes import ChangeDetector
+from sports_display.ingest import inbox, INGEST_PORT
+from sports_display.scheduler import Deadlines
+from sports_display.channel import Latest
+from sports_display.snapshot import save_snapshot, load_snapshot
+from sports_display.logos import logo_cache
+from sports_display.screens import (FONT_SMALL, FONT_LARGE, FONT_BANNER, SCREENS, PREGAME, FINAL,
+                                     NO_GAMES, MULTI_LIVE, MULTI_GAME_MAX, STALE, live_layout, game_values,
+                                     multi_values)
+from sports_display import client
+from common.fonts import fonts
+from common.frames import FrameGate
+from common.layouts import StaticLayers, compile_layout
+from rgbmatrix import RGBMatrix, RGBMatrixOptions
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+import threading
 import time
 import logging
 import json
@@ -17,32 +35,234 @@ import json
 
 UTC_OFFSET = -5
 
-FONT_PATH = '/home/sunderwood/led-display/rpi-rgb-led-matrix/fonts/'
+SPORTS = ['nfl', 'ncaafb', 'nba', 'ncaabb', 'mlb']
+
+# seconds each league gets to answer during discovery
+DISCOVERY_TIMEOUT = 15
+
+# seconds each live game holds the screen before rotating to the next
+LIVE_SLOT = 30
+
+# seconds each scheduled or final game holds the screen
+ROTATE_SLOT = 30
+
+# seconds between redraws of the locally extrapolated game clock
+CLOCK_TICK = 1
+
+# how long and how fast a game that just changed blinks its highlight frame
+HIGHLIGHT_SECONDS = 3
+HIGHLIGHT_BLINK = 0.5
+
+# seconds to wait before retrying after a display cycle fails
+ERROR_RETRY_DELAY = 10
+
+# the screen on the panel is written to disk at most this often (and
+# whenever its mode changes) so a restart can show it straight away
+SNAPSHOT_INTERVAL = 60
 
 app = Flask(__name__)
 
+
+def underway(game):
+    # started and not done yet, halftime and delays included
+    return game['status'] != 'STATUS_SCHEDULED' and game['status'] not in DONE_STATUSES
+
+
 class SportsDisplay:
 
     def log(self, message):
         logging.info(f"[SportsDisplay] {message}")
 
-    def __init__(self, nfl_teams, ncaafb_teams, nba_teams, ncaabb_teams, mlb_teams):
+    def __init__(self, nfl_teams, ncaafb_teams, nba_teams, ncaabb_teams, mlb_teams,
+                 clock=time.monotonic, sleep=time.sleep, wake=inbox.wait, matrix=None):
         self.teams = {'nfl': nfl_teams,
                       'ncaafb': ncaafb_teams,
                       'nba': nba_teams,
                       'ncaabb': ncaabb_teams,
                       'mlb': mlb_teams}
+        # producer thread: discovers and polls games on its own deadlines and
+        # publishes copies of them to the render loop through self.feed
+        self.games = []
+        self.schedule = None
+        self.mode = None
+        # games the poller refreshes, and whether a live game ended since the
+        # last discovery
+        self.tracked = []
+        self.rediscover = False
+        self.fetch_deadlines = Deadlines(clock, sleep)
+        self.wake = wake
+        self.feed = Latest()
+        # render loop: what kind of screen is up, the games it rotates
+        # through and which one is next; clock, sleep and wake are injectable
+        # so both loops can be driven without real time passing, and matrix
+        # so they can run without the panel
         self.current_display = None
-        self.matrix = self.init_matrix()
+        self.drawn_clock = None
+        self.screen = None
+        self.rotation = []
+        self.slot = 0
+        self.live_game = None
+        # index into pages() of the split screen on show, None otherwise
+        self.page = None
+        self.seen_version = 0
+        # mode of the last snapshot taken and when; taken snapshots go to
+        # the writer thread through self.snapshots
+        self.snapshot_mode = None
+        self.snapshot_at = None
+        self.snapshots = Latest()
+        self.deadlines = Deadlines(clock, sleep)
+        self.poller = PollScheduler(clock)
+        self.clocks = LiveClocks(clock)
+        self.changes = ChangeDetector()
+        # the games blinking their highlight until flash_until, driven by
+        # the 'blink' deadline; highlight is the phase of the blink
+        self.highlight = False
+        self.flashing = []
+        self.flash_until = None
+        # True from a warm start until the first fresh games arrive
+        self.warm = False
+        self.frames = FrameGate()
+        self.layers = StaticLayers()
+        self.discovery_pool = ThreadPoolExecutor(max_workers=len(SPORTS))
+        self.matrix = matrix if matrix is not None else self.init_matrix()
         self.canvas = self.matrix.CreateFrameCanvas()
         self.log(f"Initialized SportsDisplay instance. UID: {os.getuid()}")
 
 
     def run(self):
         self.log("run() called. Starting display loop.")
-        self.update_teams()
-        self.find_games()
-        self.determine_games_to_display()
+        self.warm_start()
+        # parse every font and compile every screen before the first frame
+        # instead of during drawing
+        fonts.preload([FONT_SMALL, FONT_LARGE, FONT_BANNER])
+        for layout in SCREENS:
+            compile_layout(layout)
+        threading.Thread(target=self.produce, daemon=True).start()
+        threading.Thread(target=self.write_snapshots, daemon=True).start()
+        while True:
+            self.step()
+
+
+    def produce(self):
+        # every network call happens on this thread; the render loop only
+        # ever sees what it publishes
+        self.fetch_deadlines.set('plan', 0)
+        while True:
+            self.fetch_step()
+
+
+    def fetch_step(self):
+        # one pass of the producer: 'plan' looks at the day's games and picks
+        # the screen, 'poll' refreshes the tracked games that are due; then
+        # sleep until the earliest deadline
+        try:
+            if self.fetch_deadlines.due('plan'):
+                self.update_teams()
+                self.plan_day()
+                self.determine_games_to_display()
+            if self.fetch_deadlines.due('poll'):
+                self.poll_live()
+        except Exception:
+            # a failed cycle must never take the display down
+            logging.exception("[SportsDisplay] Fetching games failed; retrying.")
+            self.fetch_deadlines.clear()
+            self.fetch_deadlines.set('plan', ERROR_RETRY_DELAY)
+
+        if self.tracked:
+            # pushed updates are applied as soon as they arrive
+            if self.fetch_deadlines.wait(self.wake):
+                self.fetch_deadlines.set('poll', 0)
+        else:
+            self.fetch_deadlines.wait()
+
+
+    def warm_start(self):
+        # the screen from before the restart, straight away: the last frame
+        # goes up as it was, then its games are handed to the render loop
+        # marked stale until the first discovery replaces them
+        snapshot = load_snapshot()
+        if snapshot is None:
+            return
+        self.log(f"Warm start from a snapshot {time.time() - snapshot.saved:.0f}s old.")
+        if snapshot.frame is not None:
+            self.canvas.SetImage(snapshot.frame, 0, 0)
+            self.canvas.SetPixel(63, 0, *STALE)
+            self.canvas.SetPixel(64, 0, *STALE)
+            self.canvas = self.matrix.SwapOnVSync(self.canvas)
+        for url, logo in snapshot.logos.items():
+            logo_cache.put(url, logo)
+        for game in snapshot.games:
+            game['stale'] = True
+        # the stale games aren't saved back over the snapshot as if new, nor
+        # do their scores count as changes once fresh ones arrive
+        self.snapshot_mode = snapshot.mode
+        self.snapshot_at = self.deadlines.clock()
+        self.changes.track(snapshot.games)
+        self.warm = True
+        self.feed.put({'mode': snapshot.mode, 'games': snapshot.games})
+
+
+    def publish(self):
+        # copies, so the renderer never sees a game halfway through an update;
+        # the live screen shows only the games under way
+        games = [game for game in self.games if underway(game)] if self.mode == 'live' else self.games
+        self.feed.put({'mode': self.mode, 'games': [game.copy() for game in games]})
+
+
+    def take_snapshot(self, plan, values):
+        # taken by the render loop right after a frame goes up, so the frame,
+        # mode and games on disk all come from the same snapshot; encoding
+        # and writing them is left to write_snapshots. A frame flashing a
+        # change isn't worth keeping; the next one is
+        now = self.deadlines.clock()
+        if self.flashing or (self.screen == self.snapshot_mode and now - self.snapshot_at < SNAPSHOT_INTERVAL):
+            return
+        self.snapshot_mode = self.screen
+        self.snapshot_at = now
+        games = [game.copy() for game in self.rotation if isinstance(game, Game)]
+        logos = {}
+        for game in games:
+            for side in ('away', 'home'):
+                logo = logo_cache.peek(game[side + '_logo'])
+                if logo is not None:
+                    logos[game[side + '_logo']] = logo
+        self.snapshots.put((self.screen, games, logos, plan.image(values)))
+
+
+    def write_snapshots(self):
+        # the disk side of take_snapshot, on its own thread so a slow SD card
+        # never holds up a frame
+        written = 0
+        while True:
+            self.snapshots.wait(None)
+            version, snapshot = self.snapshots.get()
+            if version != written:
+                written = version
+                save_snapshot(*snapshot)
+
+
+    def step(self):
+        # one pass of the render loop: take the newest snapshot, 'rotate' to
+        # the next slot, 'tick' the live clock; then sleep until the earliest
+        # deadline or the next snapshot. Nothing here waits on the network
+        try:
+            version, snapshot = self.feed.get()
+            if version != self.seen_version:
+                self.seen_version = version
+                self.show(snapshot)
+            if self.deadlines.due('rotate'):
+                self.rotate()
+            if self.deadlines.due('tick'):
+                self.tick()
+            if self.deadlines.due('blink'):
+                self.blink()
+        except Exception:
+            logging.exception("[SportsDisplay] Drawing failed; retrying.")
+            self.end_flash()
+            self.deadlines.clear()
+            self.deadlines.set('rotate', ERROR_RETRY_DELAY)
+
+        self.deadlines.wait(self.feed.wait)
 
     
     def update_teams(self):
@@ -66,32 +286,240 @@ class SportsDisplay:
                           'mlb': ['Milwaukee Brewers']}
 
 
+    def plan_day(self):
+        # discovery runs once per day, again when a live game ends and while
+        # the day is empty or a league didn't answer; from shortly before
+        # each start the poller keeps the games up to date in between
+        now = datetime.now()
+        if self.schedule is None or not self.schedule.covers(now.date(), self.teams):
+            self.schedule = load_schedule(now.date(), self.teams)
+            if self.schedule is None:
+                complete = self.find_games()
+                self.schedule = DailySchedule(now.date(), self.teams, self.games, complete)
+                self.schedule.save()
+                return
+            self.log("Loaded today's schedule from disk.")
+
+        if self.rediscover or self.schedule.discovery_due(now):
+            self.rediscover = False
+            complete = self.find_games()
+            self.schedule.update(self.games, complete)
+            self.schedule.save()
+        else:
+            self.set_games(self.schedule.games)
+            self.log(f"Nothing to discover until {self.schedule.next_plan(now):%Y-%m-%d %H:%M}.")
+
+
+    def idle_seconds(self, minimum=30):
+        # how long the producer can sleep before the day needs planning again
+        return max(minimum, self.schedule.seconds_until_plan(datetime.now()))
+
+
+    def set_games(self, games):
+        self.games = games
+        self.unique_statuses = list(set([game['status'] for game in self.games]))
+
+
+    def discover(self, sport, today):
+        # leagues without followed teams or out of season cost no requests
+        if not self.teams[sport] or not in_season(sport, today):
+            return []
+        return get_current_games(sport, self.teams[sport], UTC_OFFSET)
+
+
     def find_games(self):
+        # True when every league answered; a league that didn't keeps its
+        # last known games, marked stale. Games already known are updated in
+        # place so their pushed fields survive
         self.log("Finding games...")
-        self.games = []
-        for sport in ['nfl', 'ncaafb', 'nba', 'ncaabb', 'mlb']:
-            self.games = self.games + get_current_games(sport, self.teams[sport], UTC_OFFSET)
-        self.unique_statuses = list(set([game['status'] for game in self.games]))
+        # query every league at once so discovery takes as long as the slowest one
+        today = datetime.now().date()
+        futures = {self.discovery_pool.submit(self.discover, sport, today): sport for sport in SPORTS}
+        done, not_done = wait(futures, timeout=DISCOVERY_TIMEOUT)
+        games = []
+        complete = True
+        for future, sport in futures.items():
+            if future in not_done:
+                self.log(f"Timed out finding {sport} games.")
+                future.cancel()
+            elif future.exception() is not None:
+                self.log(f"Error finding {sport} games: {future.exception()}")
+            else:
+                games.extend(future.result())
+                continue
+            complete = False
+            # keep showing what we last knew about this league, marked stale
+            previous = [game for game in self.games if game['sport'] == sport]
+            for game in previous:
+                game['stale'] = True
+            games.extend(previous)
+        known = {game['id']: game for game in self.games}
+        for index, game in enumerate(games):
+            current = known.get(game['id'])
+            if current is not None and current is not game:
+                for key, value in game.as_dict().items():
+                    current[key] = value
+                games[index] = current
+        # keep the league order stable regardless of which answered first
+        inbox.hold(games)
+        self.set_games(games)
+        # fetch logos in the background so drawing a game never waits on them
+        logo_cache.prefetch([game[side + '_logo'] for game in self.games for side in ('away', 'home')])
         self.log(f"Found {len(self.games)} games. Statuses: {self.unique_statuses}")
+        self.log(f"Request latency by host: {client.client.latency()}")
+        self.log(f"Logo cache: {logo_cache.stats()}")
+        self.log(f"Fonts: {fonts.stats()}")
+        self.log(f"Frames: {self.frames.stats()}")
+        return complete
 
 
     def determine_games_to_display(self):
         self.log("Determining which games to display...")
+        # games from their pregame lead until they are done are polled; the
+        # state of games that stopped being polled is dropped so it doesn't
+        # pile up over weeks of running
+        now = datetime.now()
+        tracked = [game for game in self.games if self.schedule.polled(game, now)]
+        ids = {game['id'] for game in tracked}
+        ended = [game for game in self.tracked if game['id'] not in ids]
+        self.poller.forget(ended)
+        self.clocks.forget(ended)
+        inbox.forget(ended)
+        self.tracked = tracked
+        self.poller.track(self.tracked)
+
         if len(self.games) == 0:
             self.log("No games found. Running no-games display.")
-            self.run_display_no_games()
-        elif 'STATUS_IN_PROGRESS' in self.unique_statuses:
+            self.mode = 'no games'
+        elif any(underway(game) for game in self.games):
             self.log("Found in-progress games. Running live display.")
-            self.games = [game for game in self.games if game['status'] == 'STATUS_IN_PROGRESS']
-            self.run_display_live()
+            self.mode = 'live'
+            for game in self.games:
+                if underway(game):
+                    self.clocks.sync(game)
         else:
             self.log("No in-progress games. Rotating through scheduled/final games.")
-            self.run_display_not_live()
+            self.mode = 'not live'
+        self.fetch_deadlines.set('plan', self.idle_seconds())
+        if self.tracked:
+            self.schedule_poll()
+        else:
+            self.fetch_deadlines.cancel('poll')
+        self.publish()
+
+
+    def schedule_poll(self):
+        wait = self.poller.seconds_until_due(self.tracked)
+        if wait is None:
+            # every tracked game has finished
+            self.fetch_deadlines.cancel('poll')
+            self.fetch_deadlines.set('plan', 0)
+            return
+        self.fetch_deadlines.set('poll', wait)
+
+
+    def poll_live(self):
+        before = {game['id']: underway(game) for game in self.tracked}
+        due = self.poller.due(self.tracked)
+        if due:
+            # one scoreboard read per feed refreshes every due game
+            update_games(due)
+            inbox.hold(due)
+        pushed = inbox.apply(self.tracked)
+        refreshed = due + [updated for updated in pushed if updated not in due]
+        if refreshed:
+            for updated in refreshed:
+                self.poller.observe(updated, pushed=updated in pushed)
+                self.clocks.sync(updated)
+            self.log(f"Poll intervals: {self.poller.intervals(self.tracked)}")
+            if any(underway(game) != before[game['id']] for game in refreshed):
+                # a game started or ended: pick the screen again, and after
+                # a live game ends discover the day again
+                if any(before[game['id']] and game['status'] in DONE_STATUSES for game in refreshed):
+                    self.rediscover = True
+                self.fetch_deadlines.set('plan', 0)
+            self.publish()
+        self.schedule_poll()
+
+
+    def show(self, snapshot):
+        games = snapshot['games']
+        if self.warm and not any(game.get('stale') for game in games):
+            # the first fresh games after a warm start: whatever moved while
+            # the display was down isn't a change worth flashing
+            self.changes.reset(games)
+            self.warm = False
+        if snapshot['mode'] != self.screen or \
+                [game['id'] for game in games] != [game['id'] for game in self.rotation if isinstance(game, Game)]:
+            self.start_rotation(snapshot['mode'], games)
+            return
+
+        if self.screen == 'no games':
+            return
+        # the same games with fresher data: swap them in and bring the
+        # screen up to date
+        self.rotation = games
+        if self.screen != 'live':
+            current = [game for game in games if not self.display_change_needed(game)]
+            if current:
+                self.current_display = current[0]
+                self.draw_not_live(current[0])
+            return
+        changes = self.changes.detect(games)
+        if self.page is not None:
+            self.show_page(changes)
+            return
+        self.live_game = next((game for game in games if game['id'] == self.live_game['id']), games[0])
+        if changes:
+            # a change in any live game takes over the screen right away
+            changed, kinds = changes[0]
+            self.log(f"{changed['name']} changed: {kinds}")
+            self.live_game = changed
+            self.current_display = changed
+            self.flash_change([changed])
+            self.deadlines.set('rotate', LIVE_SLOT)
+        else:
+            self._draw_live(self.live_game)
+
+
+    def show_page(self, changes):
+        # every game on the split screen is redrawn with its fresh data, so a
+        # score is never more than one snapshot old however many are live
+        pages = self.pages()
+        changed = [game for game, kinds in changes]
+        for game, kinds in changes:
+            self.log(f"{game['name']} changed: {kinds}")
+        if changed and not any(game in pages[self.page] for game in changed):
+            # a change on another page brings that page up
+            self.page = next(index for index, page in enumerate(pages) if any(game in page for game in changed))
+            self.slot = self.page + 1
+            self.deadlines.set('rotate', LIVE_SLOT)
+        if changed:
+            self.flash_change([game for game in changed if game in pages[self.page]])
+        else:
+            self._draw_page(pages[self.page], self.flashing)
+
+
+    def start_rotation(self, mode, games):
+        # show each game for one slot, round and round until the games change
+        self.end_flash()
+        ids = {game['id'] for game in games}
+        self.changes.forget([game for game in self.rotation if isinstance(game, Game) and game['id'] not in ids])
+        self.screen = mode
+        self.rotation = list(games) if games else ['No games']
+        self.slot = 0
+        self.page = None
+        if mode == 'live':
+            self.changes.track(games)
+            # Reset current_display to ensure live display always draws initially
+            self.current_display = None
+        self.deadlines.cancel('tick')
+        self.deadlines.set('rotate', 0)
 
 
     def display_change_needed(self, game):
-        if type(game) is dict and type(self.current_display) is dict:
-            if game['home_team'] == self.current_display['home_team']:
+        if isinstance(game, Game) and isinstance(self.current_display, Game):
+            if game['id'] == self.current_display['id']:
                 return False
         else:
             if game == self.current_display:
@@ -99,88 +527,120 @@ class SportsDisplay:
         return True
 
 
-    def run_display_not_live(self):
+    def pages(self):
+        # with more than one game live they share the screen, at most
+        # MULTI_GAME_MAX at a time and evenly split so no page is left with
+        # a single game
+        count = -(-len(self.rotation) // MULTI_GAME_MAX)
+        bounds = [len(self.rotation) * i // count for i in range(count + 1)]
+        return [self.rotation[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+    def rotate(self):
+        multi = self.screen == 'live' and len(self.rotation) > 1
+        slots = self.pages() if multi else self.rotation
+        if self.slot >= len(slots):
+            self.slot = 0
+        game = slots[self.slot]
+        self.slot += 1
+        # moving on ends any highlight
+        self.end_flash()
+        if multi:
+            self.run_display_multi(self.slot - 1)
+        elif self.screen == 'live':
+            self.run_display_live(game)
+        elif self.screen == 'not live':
+            self.run_display_not_live(game)
+        else:
+            self.run_display_no_games()
+
+
+    def run_display_not_live(self, game):
         self.log("Displaying: Not live (scheduled/final) games.")
-        # cycle through games, displaying one per 30 seconds
-        for game in self.games:
-            if self.display_change_needed(game):
-                if game['status'] == 'STATUS_SCHEDULED':
-                    self.draw_pregame(game)
-                elif game['status'] == 'STATUS_FINAL':
-                    self.draw_postgame(game)
-            time.sleep(30)
+        if self.display_change_needed(game):
+            self.draw_not_live(game)
+        self.deadlines.set('rotate', ROTATE_SLOT)
 
-        self.run()
+
+    def draw_not_live(self, game):
+        if game['status'] == 'STATUS_SCHEDULED':
+            self.draw_pregame(game)
+        elif game['status'] == 'STATUS_FINAL':
+            self.draw_postgame(game)
 
 
     def run_display_no_games(self):
         self.log("Displaying: No games today.")
         if self.display_change_needed('No games'):
-            font = graphics.Font()
-            font.LoadFont(FONT_PATH+'9x15B.bdf')
-            self.canvas.Clear()
-            color = graphics.Color(255, 255, 255)
-            graphics.DrawText(self.canvas, font, 28, 14, color, 'NO GAMES')
-            graphics.DrawText(self.canvas, font, 37, 28, color, 'TODAY!')
+            self._render(NO_GAMES, {})
             self.current_display = 'No games'
-            self.canvas = self.matrix.SwapOnVSync(self.canvas)
+        self.deadlines.set('rotate', ROTATE_SLOT)
 
-        time.sleep(30)
-        self.run()
 
-
-    def run_display_live(self):
+    def run_display_live(self, game):
         self.log("Displaying: Live games.")
-        # Reset current_display to ensure live display always draws initially to cache logos
+        # each live game holds the screen for LIVE_SLOT seconds
+        if self.display_change_needed(game):
+            self._draw_live(game)
+            self.current_display = game
+        self.live_game = game
+        self.deadlines.set('rotate', LIVE_SLOT)
+        self.deadlines.set('tick', CLOCK_TICK)
+
+
+    def run_display_multi(self, page):
+        self.log("Displaying: Live games, split screen.")
+        self.page = page
+        self.live_game = None
         self.current_display = None
-        # cycle through games, displaying one per 30 seconds
-        if len(self.games) > 1:
-            for game in self.games:
-                sport = game['sport']
-                if self.display_change_needed(game):
-                    if sport == 'nfl':
-                        self._draw_live_fb(game, True)
-                        self.current_display = game
-                    elif sport == 'nba' or sport == 'ncaabb':
-                        self._draw_live_bb(game, True)
-                        self.current_display = game
-                    else:
-                        self._draw_live_bb(game, True)  # fallback
-                        self.current_display = game
-                for i in range(3):
-                    time.sleep(10)
-                    update = update_game(game)
-                    if sport == 'nfl':
-                        self._draw_live_fb(update, False)
-                    elif sport == 'nba' or sport == 'ncaabb':
-                        self._draw_live_bb(update, False)
-                    else:
-                        self._draw_live_bb(update, False)  # fallback
-                    
-            self.run()
-
+        self._draw_page(self.pages()[page])
+        self.deadlines.set('rotate', LIVE_SLOT)
+        self.deadlines.set('tick', CLOCK_TICK)
+
+
+    def tick(self):
+        # redraw when a locally extrapolated clock moved on; the frame gate
+        # skips split screens whose clocks all stood still
+        if self.page is not None:
+            self._draw_page(self.pages()[self.page], self.flashing)
+        elif self.clocks.text(self.live_game) != self.drawn_clock:
+            self._draw_live(self.live_game)
+        self.deadlines.set('tick', CLOCK_TICK)
+
+
+    def flash_change(self, games):
+        # blinks the highlight frame of a single game, or the scores of the
+        # changed games on the split screen, for HIGHLIGHT_SECONDS; the
+        # 'blink' deadline drives it so the clock keeps ticking meanwhile
+        self.flashing = games
+        self.flash_until = self.deadlines.clock() + HIGHLIGHT_SECONDS
+        self.highlight = False
+        self.blink()
+
+
+    def blink(self):
+        if self.deadlines.clock() >= self.flash_until:
+            games = self.flashing
+            self.end_flash()
+            self._draw_changed(games)
+            return
+        self.highlight = not self.highlight
+        self._draw_changed(self.flashing)
+        self.deadlines.set('blink', HIGHLIGHT_BLINK)
+
+
+    def end_flash(self):
+        self.highlight = False
+        self.flashing = []
+        self.deadlines.cancel('blink')
+
+
+    def _draw_changed(self, games):
+        # a single game is redrawn from the newest data on the rotation
+        if self.page is not None:
+            self._draw_page(self.pages()[self.page], games)
         else:
-            game = self.games[0]
-            if self.display_change_needed(game):
-                if game['sport'] == 'nfl':
-                    self._draw_live_fb(game, True)
-                    self.current_display = game
-                elif game['sport'] == 'nba' or game['sport'] == 'ncaabb':
-                    self._draw_live_bb(game, True)
-                    self.current_display = game
-                else:
-                    self._draw_live_bb(game, True)  # fallback
-                    self.current_display = game
-            for i in range(3):
-                time.sleep(10)
-                update = update_game(game)
-                if game['sport'] == 'nfl':
-                    self._draw_live_fb(update, False)
-                elif game['sport'] == 'nba' or game['sport'] == 'ncaabb':
-                    self._draw_live_bb(update, False)
-                else:
-                    self._draw_live_bb(update, False)  # fallback
-            self.run()
+            self._draw_live(self.live_game)
 
 
     def init_matrix(self):
@@ -196,151 +656,62 @@ class SportsDisplay:
         return RGBMatrix(options = options)
 
 
-    def draw_pregame(self, game):
-        font_large = graphics.Font()
-        font_large.LoadFont(FONT_PATH+'8x13B.bdf')
-
-        self.canvas.Clear()
-
-        # create team names
-        away_rgb = tuple(int(game['away_color'][i:i+2], 16) for i in (0, 2, 4))
-        away_color = graphics.Color(away_rgb[0], away_rgb[1], away_rgb[2])
-        home_rgb = tuple(int(game['home_color'][i:i+2], 16) for i in (0, 2, 4))
-        home_color = graphics.Color(home_rgb[0], home_rgb[1], home_rgb[2])
-        text_color = graphics.Color(255, 255, 255)
-
-        graphics.DrawText(self.canvas, font_large, 34 if len(game['away_abbreviation']) == 3 else 39, 28, text_color, game['away_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 70 if len(game['home_abbreviation']) == 3 else 75, 28, text_color, game['home_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 60, 28, text_color, '@')
-
-        # write game time
-        game_time = game['time']
-        game_time_str = game_time.strftime('%I:%M %p')
-        graphics.DrawText(self.canvas, font_large, 34, 14, text_color, game_time_str.split(' ')[0])
-        graphics.DrawText(self.canvas, font_large, 78, 14, text_color, game_time_str.split(' ')[1])
-
-        # create logos
-        away_response = requests.get(game['away_logo'])
-        away_logo = Image.open(BytesIO(away_response.content)).resize((32,32),1)
-        self.canvas.SetImage(away_logo.convert("RGB"), 0, 0)
-        home_response = requests.get(game['home_logo'])
-        home_logo = Image.open(BytesIO(home_response.content)).resize((32,32),1)
-        self.canvas.SetImage(home_logo.convert("RGB"), 96, 0)
-        self.canvas = self.matrix.SwapOnVSync(self.canvas)
-
-        self.current_display = game
-
-    def _draw_live_fb(self, data, fetch_logos=True):
-        font_small = graphics.Font()
-        font_small.LoadFont(FONT_PATH+'5x8.bdf')
+    def _render(self, layout, values):
+        # frames whose values all match what is on the panel are skipped
+        plan = compile_layout(layout)
+        self.frames.render(plan.key(values), lambda: self._paint(plan, values))
 
-        font_large = graphics.Font()
-        font_large.LoadFont(FONT_PATH+'8x13B.bdf')
 
-        self.canvas.Clear()
-
-        # create team names
-        text_color = graphics.Color(255, 255, 255)
-        possession_color = graphics.Color(255, 255, 0)  # yellow
-
-        away_text_color = possession_color if data.get('possession') == data['away_team'] else text_color
-        home_text_color = possession_color if data.get('possession') == data['home_team'] else text_color
-
-        graphics.DrawText(self.canvas, font_large, 34 if len(data['away_abbreviation']) == 3 else 39, 30, away_text_color, data['away_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 70 if len(data['home_abbreviation']) == 3 else 75, 30, home_text_color, data['home_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 60, 30, text_color, '@')
-
-        # write game score/time
-        graphics.DrawText(self.canvas, font_small, 64-(len(str(data.get('clock','')))*5-1)/2, 19, text_color, data.get('clock',''))
-        graphics.DrawText(self.canvas, font_large, 34 if int(data['away_score']) >= 100 else 39, 12, text_color, data['away_score'])
-        graphics.DrawText(self.canvas, font_large, 70 if int(data['home_score']) >= 100 else 75, 12, text_color, data['home_score'])
-        graphics.DrawText(self.canvas, font_small, 61, 12, text_color, 'Q'+str(data.get('period', '?')))
-
-        # draw down and distance
-        down_text = data.get('down', '')
-        if down_text:
-            pass
-            # graphics.DrawText(self.canvas, font_small, 64 - (len(down_text) * 5 // 2), 32, text_color, down_text)
-
-        if fetch_logos:
-            self.away_logo = Image.open(BytesIO(requests.get(data['away_logo']).content)).resize((32,32),1).convert("RGB")
-            self.home_logo = Image.open(BytesIO(requests.get(data['home_logo']).content)).resize((32,32),1).convert("RGB")
-        
-        self.canvas.SetImage(self.away_logo, 0, 0)
-        self.canvas.SetImage(self.home_logo, 96, 0)
+    def _paint(self, plan, values):
+        plan.paint(self.canvas, values, self.layers)
         self.canvas = self.matrix.SwapOnVSync(self.canvas)
+        self.take_snapshot(plan, values)
 
 
+    def _draw_live(self, game):
+        self.drawn_clock = self.clocks.text(game)
+        self._render(live_layout(game), game_values(game, self.drawn_clock, self.highlight))
 
-    def _draw_live_bb(self, data, fetch_logos=True):
-        font_small = graphics.Font()
-        font_small.LoadFont(FONT_PATH+'5x8.bdf')
 
-        font_large = graphics.Font()
-        font_large.LoadFont(FONT_PATH+'8x13B.bdf')
+    def _draw_page(self, games, flashing=()):
+        clocks = {game['id']: self.clocks.text(game) for game in games}
+        values = multi_values(games, clocks, {game['id'] for game in flashing}, self.highlight)
+        self._render(MULTI_LIVE[len(games)], values)
 
-        self.canvas.Clear()
 
-        # create team names
-        text_color = graphics.Color(255, 255, 255)
+    def draw_pregame(self, game):
+        self._render(PREGAME, game_values(game, highlight=self.highlight))
+        self.current_display = game
 
-        graphics.DrawText(self.canvas, font_large, 34 if len(data['away_abbreviation']) == 3 else 39, 30, text_color, data['away_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 70 if len(data['home_abbreviation']) == 3 else 75, 30, text_color, data['home_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 60, 30, text_color, '@')
 
-        # write game score/time
-        graphics.DrawText(self.canvas, font_small, 64-(len(str(data['clock']))*5-1)/2, 19, text_color, data['clock'])
-        graphics.DrawText(self.canvas, font_large, 34 if int(data['away_score']) >= 100 else 39, 12, text_color, data['away_score'])
-        graphics.DrawText(self.canvas, font_large, 70 if int(data['home_score']) >= 100 else 75, 12, text_color, data['home_score'])
-        graphics.DrawText(self.canvas, font_small, 61, 12, text_color, str(data['period']))
+    def draw_postgame(self, game):
+        self._render(FINAL, game_values(game, highlight=self.highlight))
+        self.current_display = game
 
-        if fetch_logos:
-            self.away_logo = Image.open(BytesIO(requests.get(data['away_logo']).content)).resize((32,32),1).convert("RGB")
-            self.home_logo = Image.open(BytesIO(requests.get(data['home_logo']).content)).resize((32,32),1).convert("RGB")
-        
-        self.canvas.SetImage(self.away_logo, 0, 0)
-        self.canvas.SetImage(self.home_logo, 96, 0)
-        self.canvas = self.matrix.SwapOnVSync(self.canvas)
 
-    def draw_postgame(self, game):
-        font_small = graphics.Font()
-        font_small.LoadFont(FONT_PATH+'5x8.bdf')
-
-        font_large = graphics.Font()
-        font_large.LoadFont(FONT_PATH+'8x13B.bdf')
-
-        self.canvas.Clear()
-
-        # create team names
-        away_rgb = tuple(int(game['away_color'][i:i+2], 16) for i in (0, 2, 4))
-        away_color = graphics.Color(away_rgb[0], away_rgb[1], away_rgb[2])
-        home_rgb = tuple(int(game['home_color'][i:i+2], 16) for i in (0, 2, 4))
-        home_color = graphics.Color(home_rgb[0], home_rgb[1], home_rgb[2])
-        text_color = graphics.Color(255, 255, 255)
-
-        graphics.DrawText(self.canvas, font_large, 34 if len(game['away_abbreviation']) == 3 else 39, 30, text_color, game['away_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 70 if len(game['home_abbreviation']) == 3 else 75, 30, text_color, game['home_abbreviation'])
-        graphics.DrawText(self.canvas, font_large, 60, 30, text_color, '@')
-
-        # write game score/time
-        graphics.DrawText(self.canvas, font_small, 52, 19, text_color, 'FINAL')
-        graphics.DrawText(self.canvas, font_large, 34 if int(game['away_score']) >= 100 else 39, 12, text_color, game['away_score'])
-        graphics.DrawText(self.canvas, font_large, 70 if int(game['home_score']) >= 100 else 75, 12, text_color, game['home_score'])
-
-        # create logos
-        away_response = requests.get(game['away_logo'])
-        away_logo = Image.open(BytesIO(away_response.content)).resize((32,32),1)
-        self.canvas.SetImage(away_logo.convert("RGB"), 0, 0)
-        home_response = requests.get(game['home_logo'])
-        home_logo = Image.open(BytesIO(home_response.content)).resize((32,32),1)
-        self.canvas.SetImage(home_logo.convert("RGB"), 96, 0)
-        self.canvas = self.matrix.SwapOnVSync(self.canvas)
+@app.route('/games', methods=['POST'])
+def push_games():
+    # score/state updates pushed from another machine, in the shape
+    # get_current_games produces: one game object or a list of them
+    payload = request.get_json(force=True, silent=True)
+    updates = payload if isinstance(payload, list) else [payload]
+    try:
+        accepted = inbox.put(updates)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(accepted=accepted), 202
 
-        self.current_display = game
+
+def start_ingest_server():
+    server = threading.Thread(target=app.run,
+                              kwargs={'host': '0.0.0.0', 'port': INGEST_PORT, 'use_reloader': False},
+                              daemon=True)
+    server.start()
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+    start_ingest_server()
 
     # Use defaults for standalone run
     default_teams = {
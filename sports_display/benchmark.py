@@ -0,0 +1,162 @@
+import sys
+import os
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from datetime import datetime, timedelta
+from sports_display.get_data import SCOREBOARD_URLS, get_current_games, scoreboards, update_games
+from sports_display.leagues import LEAGUE_PATHS, LEAGUE_URLS
+from sports_display.parse import iter_events, parse_games
+from sports_display.recordings import load_fixture, load_manifest
+from sports_display.replay import ReplayServer, default_fixtures
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+
+
+def legacy_parse(text, sport, teams, utc_offset, today):
+    # the pre-streaming approach: load the whole document, then build a dict
+    # per matching event with a strptime call for every event
+    games = []
+    for event in json.loads(text)['events']:
+        event_date = datetime.strptime(event['date'], '%Y-%m-%dT%H:%MZ') + timedelta(hours=utc_offset)
+        for team in teams:
+            if team in event['name'] and event_date.date() == today:
+                competition = event['competitions'][0]
+                game = {'time': event_date.time(),
+                        'status': event['status']['type']['name'],
+                        'clock': event['status']['displayClock'],
+                        'period': event['status']['period'],
+                        'sport': sport,
+                        'name': event['name']}
+                for competitor in competition['competitors']:
+                    side = competitor['homeAway']
+                    game[side + '_team'] = competitor['team']['name']
+                    game[side + '_score'] = competitor['score']
+                games.append(game)
+    return games
+
+
+def measure(parse, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    parse()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def bench_payload(path, sport, team_ids, team_names, repeat):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    today = datetime.now().date()
+    wanted = set(team_ids) | set(team_names)
+    legacy = measure(lambda: legacy_parse(text, sport, team_names, 0, today), repeat)
+    streamed = measure(lambda: parse_games(text, sport, wanted, 0, today), repeat)
+    print(f"{os.path.basename(path)} ({len(text) / 1024:.0f} KiB)")
+    print(f"  legacy:   {legacy[0] * 1000:8.2f} ms  peak {legacy[1] / 1024:8.0f} KiB")
+    print(f"  streamed: {streamed[0] * 1000:8.2f} ms  peak {streamed[1] / 1024:8.0f} KiB")
+    print(f"  speedup {legacy[0] / streamed[0]:.2f}x, peak memory {streamed[1] / legacy[1]:.0%} of legacy")
+
+
+def _rate(size, seconds):
+    return f"{size / seconds / 1024 / 1024:7.1f} MiB/s"
+
+
+def bench_fixture(name, entry, repeat):
+    # parse throughput and peak memory for one recorded fixture; returns False
+    # when the result no longer matches what the manifest recorded
+    text = load_fixture(name)
+    today = datetime.strptime(entry['date'], '%Y-%m-%d').date()
+    wanted = set(entry['teams'])
+    print(f"{name} [{entry['sport']}] ({len(text) / 1024:.0f} KiB)")
+
+    if entry['games'] is None:
+        # malformed: parsing has to fail cleanly, not hang or return junk
+        start = time.perf_counter()
+        try:
+            parse_games(text, entry['sport'], wanted, 0, today)
+        except ValueError as e:
+            print(f"  rejected in {(time.perf_counter() - start) * 1000:.2f} ms: {type(e).__name__}")
+            return True
+        print("  FAIL: malformed payload parsed without an error")
+        return False
+
+    games = parse_games(text, entry['sport'], wanted, 0, today)
+    parse = measure(lambda: parse_games(text, entry['sport'], wanted, 0, today), repeat)
+    scan = measure(lambda: sum(1 for event in iter_events(text)), repeat)
+    print(f"  parse_games: {parse[0] * 1000:8.2f} ms  {_rate(len(text), parse[0])}  peak {parse[1] / 1024:8.0f} KiB")
+    print(f"  iter_events: {scan[0] * 1000:8.2f} ms  {_rate(len(text), scan[0])}  peak {scan[1] / 1024:8.0f} KiB")
+    if len(games) != entry['games']:
+        print(f"  FAIL: found {len(games)} followed games, recorded {entry['games']}")
+        return False
+    return True
+
+
+def bench_replay(fixtures, manifest, repeat, latency):
+    # get_current_games and update_games end to end against the replay server
+    server = ReplayServer(fixtures, port=0, latency=latency).start()
+    for sport, path in LEAGUE_PATHS.items():
+        LEAGUE_URLS[sport] = server.url + path
+        SCOREBOARD_URLS[sport] = LEAGUE_URLS[sport] + '/scoreboard'
+    ok = True
+    try:
+        for sport, name in sorted(fixtures.items()):
+            teams = manifest[name]['teams']
+            discover = update = None
+            for i in range(repeat):
+                scoreboards.invalidate()
+                start = time.perf_counter()
+                games = get_current_games(sport, teams, 0)
+                elapsed = time.perf_counter() - start
+                discover = elapsed if discover is None else min(discover, elapsed)
+                scoreboards.invalidate()
+                start = time.perf_counter()
+                update_games(games)
+                elapsed = time.perf_counter() - start
+                update = elapsed if update is None else min(update, elapsed)
+            stale = sum(1 for game in games if game['stale'])
+            print(f"{name} [{sport}] via replay: discover {discover * 1000:8.2f} ms, "
+                  f"update {update * 1000:8.2f} ms, {len(games)} games, {stale} stale")
+            if len(games) != manifest[name]['games'] or stale:
+                print(f"  FAIL: expected {manifest[name]['games']} fresh games")
+                ok = False
+    finally:
+        server.stop()
+    print(f"replay server answered {server.served} requests")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark scoreboard parsing on recorded ESPN payloads.")
+    parser.add_argument('payloads', nargs='*', help="scoreboard JSON files to compare with the legacy parser; "
+                                                    "without any, every recorded fixture is benchmarked")
+    parser.add_argument('--fixture', action='append', default=[], help="only benchmark these fixtures")
+    parser.add_argument('--replay', action='store_true', help="also run the data layer against the replay server")
+    parser.add_argument('--latency', type=float, default=0.0, help="replay server latency in seconds")
+    parser.add_argument('--sport', default='ncaafb')
+    parser.add_argument('--team-id', action='append', default=[], help="followed ESPN team id")
+    parser.add_argument('--team', action='append', default=[], help="followed team display name")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    for path in args.payloads:
+        bench_payload(path, args.sport, args.team_id, args.team or ['Wisconsin Badgers'], args.repeat)
+
+    if not args.payloads:
+        manifest = load_manifest()
+        names = args.fixture or sorted(manifest)
+        ok = all([bench_fixture(name, manifest[name], args.repeat) for name in names])
+        if args.replay:
+            fixtures = {sport: name for sport, name in default_fixtures().items() if name in names}
+            ok = bench_replay(fixtures, manifest, args.repeat, args.latency) and ok
+        sys.exit(0 if ok else 1)
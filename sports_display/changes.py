@@ -0,0 +1,55 @@
+import threading
+
+
+class ChangeDetector:
+    # remembers the last seen score, possession and period of every tracked
+    # game and reports what moved since then
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # game id -> {'score', 'possession', 'period'}
+        self._seen = {}
+
+
+    def _state(self, game):
+        return {'score': (game.get('home_score'), game.get('away_score')),
+                'possession': game.get('possession'),
+                'period': game.get('period')}
+
+
+    def track(self, games):
+        # start watching games without reporting their current state as a change
+        with self._lock:
+            for game in games:
+                self._seen.setdefault(game['id'], self._state(game))
+
+
+    def reset(self, games):
+        # take games' current state as seen, whatever was seen before
+        with self._lock:
+            for game in games:
+                self._seen[game['id']] = self._state(game)
+
+
+    def detect(self, games):
+        # [(game, ['score', 'possession', 'period']), ...] for games that changed,
+        # scoring changes first
+        changed = []
+        with self._lock:
+            for game in games:
+                state = self._state(game)
+                previous = self._seen.get(game['id'])
+                self._seen[game['id']] = state
+                if previous is None:
+                    continue
+                kinds = [kind for kind in ('score', 'possession', 'period') if state[kind] != previous[kind]]
+                if kinds:
+                    changed.append((game, kinds))
+        changed.sort(key=lambda change: 'score' not in change[1])
+        return changed
+
+
+    def forget(self, games):
+        with self._lock:
+            for game in games:
+                self._seen.pop(game['id'], None)
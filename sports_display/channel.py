@@ -0,0 +1,33 @@
+import threading
+
+
+class Latest:
+    # single-slot channel: the producer overwrites the value, the consumer
+    # always reads the newest one and never waits on the producer's work
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._published = threading.Event()
+        self._value = None
+        self.version = 0
+
+
+    def put(self, value):
+        with self._lock:
+            self._value = value
+            self.version += 1
+        self._published.set()
+
+
+    def get(self):
+        # (version, value); version only grows, so a consumer can tell
+        # whether anything arrived since it last looked
+        with self._lock:
+            return self.version, self._value
+
+
+    def wait(self, timeout):
+        # sleep up to timeout (forever if None), waking early on a put
+        published = self._published.wait(timeout)
+        self._published.clear()
+        return published
@@ -0,0 +1,198 @@
+from collections import OrderedDict
+from urllib.parse import urlparse
+import logging
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# (connect, read) seconds; a hung socket must never freeze the display
+TIMEOUT = (3.05, 10)
+
+# extra attempts after the first one fails
+MAX_RETRIES = 2
+BACKOFF = 0.5
+JITTER = 0.5
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# consecutive failed requests before an endpoint's breaker opens
+FAILURE_THRESHOLD = 3
+# seconds the breaker stays open after its first trip, doubling per trip
+BREAKER_BACKOFF = 15
+BREAKER_MAX_BACKOFF = 10 * 60
+# breakers kept; every logo url gets its own, so the least recently used
+# closed ones are dropped (a closed breaker holds nothing worth keeping)
+BREAKER_SLOTS = 64
+
+
+class CircuitOpenError(requests.RequestException):
+    pass
+
+
+class CircuitBreaker:
+    # closed -> open after FAILURE_THRESHOLD failures; once the backoff has
+    # passed a single half-open probe decides between closed and open again
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, backoff=BREAKER_BACKOFF, max_backoff=BREAKER_MAX_BACKOFF):
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.state = 'closed'
+        self.failures = 0
+        self.trips = 0
+        self.opened_until = 0
+        self._lock = threading.Lock()
+
+
+    def allow(self):
+        # returns 'closed' for a normal request, 'probe' for the half-open
+        # probe, or None when the request must not be made
+        with self._lock:
+            if self.state == 'closed':
+                return 'closed'
+            if self.state == 'open' and time.monotonic() >= self.opened_until:
+                self.state = 'half_open'
+                return 'probe'
+            return None
+
+
+    def success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.trips = 0
+
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.threshold:
+                delay = min(self.backoff * 2 ** self.trips, self.max_backoff)
+                self.trips += 1
+                self.state = 'open'
+                self.opened_until = time.monotonic() + delay
+                return delay
+            return None
+
+
+    def retry_in(self):
+        with self._lock:
+            return max(0, self.opened_until - time.monotonic())
+
+
+class HttpClient:
+
+    def __init__(self, timeout=TIMEOUT, max_retries=MAX_RETRIES):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # keep-alive pool shared by the ESPN API and the logo CDN, so each
+        # host pays for the TLS handshake once instead of on every request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        # host -> {'count', 'errors', 'total', 'last', 'max'}
+        self._latency = {}
+        # scheme://host/path -> CircuitBreaker, least recently used first
+        self._breakers = OrderedDict()
+
+
+    def breaker(self, url):
+        parts = urlparse(url)
+        endpoint = f"{parts.scheme}://{parts.netloc}{parts.path}"
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker()
+            self._breakers.move_to_end(endpoint)
+            self._evict_breakers()
+            return breaker
+
+
+    def _evict_breakers(self):
+        # least recently used first, never the one just handed out; an open
+        # or half-open breaker is still protecting its endpoint and stays,
+        # a closed one goes however many failures it counted
+        for endpoint in list(self._breakers)[:-1]:
+            if len(self._breakers) <= BREAKER_SLOTS:
+                return
+            if self._breakers[endpoint].state == 'closed':
+                del self._breakers[endpoint]
+
+
+    def get(self, url, **kwargs):
+        breaker = self.breaker(url)
+        mode = breaker.allow()
+        if mode is None:
+            raise CircuitOpenError(f"Circuit open for {url}, retry in {breaker.retry_in():.0f}s")
+
+        try:
+            # the half-open probe gets a single attempt
+            response = self._get(url, 0 if mode == 'probe' else self.max_retries, **kwargs)
+        except Exception:
+            self._failure(breaker, url)
+            raise
+        if response.status_code in RETRY_STATUSES:
+            self._failure(breaker, url)
+        else:
+            breaker.success()
+        return response
+
+
+    def _failure(self, breaker, url):
+        delay = breaker.failure()
+        if delay is not None:
+            logging.warning(f"[HttpClient] Circuit open for {url} for {delay:.0f}s")
+
+
+    def _get(self, url, max_retries, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(url, time.monotonic() - start, error=True)
+                if attempt >= max_retries:
+                    raise
+                logging.info(f"[HttpClient] {e.__class__.__name__} for {url}, retrying")
+            else:
+                self._record(url, time.monotonic() - start, error=response.status_code >= 500)
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                logging.info(f"[HttpClient] HTTP {response.status_code} for {url}, retrying")
+            time.sleep(BACKOFF * 2 ** attempt + random.uniform(0, JITTER))
+            attempt += 1
+
+
+    def latency(self):
+        # per-host snapshot with the mean in seconds
+        with self._lock:
+            stats = {}
+            for host, entry in self._latency.items():
+                stats[host] = dict(entry, mean=entry['total'] / entry['count'])
+            return stats
+
+
+    def _record(self, url, elapsed, error=False):
+        host = urlparse(url).netloc
+        with self._lock:
+            entry = self._latency.setdefault(host, {'count': 0, 'errors': 0, 'total': 0.0, 'last': 0.0, 'max': 0.0})
+            entry['count'] += 1
+            entry['total'] += elapsed
+            entry['last'] = elapsed
+            entry['max'] = max(entry['max'], elapsed)
+            if error:
+                entry['errors'] += 1
+
+
+client = HttpClient()
+
+
+def get(url, **kwargs):
+    return client.get(url, **kwargs)
@@ -0,0 +1,98 @@
+from sports_display.polling import CLOCK_SPORTS
+import math
+import threading
+import time
+
+
+# longest stretch the clock is run forward without a poll confirming it
+MAX_EXTRAPOLATION = 30
+
+# statuses where the payload says the clock is stopped
+STOPPED_STATUSES = {'STATUS_HALFTIME', 'STATUS_END_PERIOD', 'STATUS_DELAYED', 'STATUS_RAIN_DELAY',
+                    'STATUS_SUSPENDED', 'STATUS_FINAL', 'STATUS_SCHEDULED'}
+
+
+def parse_clock(text):
+    # ESPN displayClock ('12:34', '0:45', '45.3') -> seconds remaining
+    try:
+        if ':' in text:
+            minutes, seconds = text.split(':', 1)
+            return int(minutes) * 60 + float(seconds)
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_clock(seconds, tenths=False):
+    if tenths and seconds < 60:
+        return f"{seconds:.1f}"
+    # round up so 12:33.6 still reads 12:34, as on the broadcast clock
+    whole = math.ceil(seconds)
+    return f"{whole // 60}:{whole % 60:02d}"
+
+
+class GameClock:
+    # one game's clock, synced from each poll and run forward locally while
+    # consecutive polls show it moving
+
+    def __init__(self):
+        self.payload = None
+        self.period = None
+        self.remaining = None
+        self.tenths = False
+        self.running = False
+        self.synced = 0
+
+
+    def sync(self, game, now):
+        payload = game.get('clock')
+        period = game.get('period')
+        remaining = parse_clock(payload)
+        moved = self.payload is not None and period == self.period and payload != self.payload
+        self.running = (game['sport'] in CLOCK_SPORTS
+                        and game['status'] not in STOPPED_STATUSES
+                        and remaining is not None and remaining > 0
+                        and moved)
+        self.payload = payload
+        self.period = period
+        self.remaining = remaining
+        self.tenths = payload is not None and ':' not in payload
+        self.synced = now
+
+
+    def text(self, now):
+        if self.remaining is None:
+            return self.payload or ''
+        if not self.running:
+            return self.payload
+        elapsed = min(now - self.synced, MAX_EXTRAPOLATION)
+        return format_clock(max(0, self.remaining - elapsed), self.tenths)
+
+
+class LiveClocks:
+    # GameClock per game id; clock is injectable for testing
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._clocks = {}
+
+
+    def sync(self, game):
+        with self._lock:
+            game_clock = self._clocks.setdefault(game['id'], GameClock())
+            game_clock.sync(game, self.clock())
+
+
+    def text(self, game):
+        with self._lock:
+            game_clock = self._clocks.get(game['id'])
+            if game_clock is None:
+                return game.get('clock', '')
+            return game_clock.text(self.clock())
+
+
+    def forget(self, games):
+        with self._lock:
+            for game in games:
+                self._clocks.pop(game['id'], None)
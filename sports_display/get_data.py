@@ -1,83 +1,255 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 # from rgbmatrix import RGBMatrix, RGBMatrixOptions, graphics
-import requests
+import logging
+import threading
+import time
+from sports_display import client
+from sports_display.leagues import LEAGUE_URLS
+from sports_display.parse import iter_events, parse_games
+from sports_display.teams import resolve_teams, team_group
+
+
+SCOREBOARD_URLS = {sport: url + '/scoreboard' for sport, url in LEAGUE_URLS.items()}
+
+# seconds a downloaded scoreboard is reused before asking ESPN again; kept at
+# or below the fastest poll interval in sports_display/polling.py
+SCOREBOARD_TTL = 5
+
+# leagues whose default scoreboard only lists ranked/featured games; these are
+# queried per followed team's conference and date instead
+NARROW_SPORTS = {'ncaafb', 'ncaabb'}
+NARROW_LIMIT = 100
+
+# parsed readings kept per downloaded scoreboard (followed games, tracked
+# events); more than a handful means the queries changed and old ones are dropped
+PARSED_SLOTS = 8
+
+
+class _Flight:
+    # one in-flight scoreboard request that concurrent callers wait on
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = None
+        self.error = None
+
+
+class ScoreboardCache:
+
+    def __init__(self, ttl=SCOREBOARD_TTL):
+        self.ttl = ttl
+        self.requests_made = 0
+        self._lock = threading.Lock()
+        # (sport, params) -> {'data', 'fetched', 'etag', 'last_modified', 'stale', 'parsed'}
+        self._entries = {}
+        self._flights = {}
+
+
+    def get(self, sport, params=None):
+        # params narrow the request (dates, groups); each combination is cached separately
+        key = (sport, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry['fetched'] < self.ttl:
+                return entry['data']
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.data
+
+        try:
+            flight.data = self._fetch(key, params, entry)
+        except Exception as e:
+            if entry is None:
+                flight.error = e
+                raise
+            # keep serving the last good scoreboard, flagged as stale
+            logging.warning(f"Serving stale {sport} scoreboard: {e}")
+            with self._lock:
+                entry['stale'] = True
+            flight.data = entry['data']
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.data
+
+
+    def parsed(self, sport, params, name, parse):
+        # parse(text) of the current scoreboard, computed once per download
+        # (a 304 keeps it); name tells different readings of it apart
+        text = self.get(sport, params)
+        key = (sport, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            memo = entry['parsed'] if entry is not None and entry['data'] is text else None
+            if memo is not None and name in memo:
+                return memo[name]
+        result = parse(text)
+        if memo is not None:
+            with self._lock:
+                if len(memo) >= PARSED_SLOTS:
+                    memo.clear()
+                memo[name] = result
+        return result
+
+
+    def is_stale(self, sport, params=None):
+        key = (sport, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry['stale']
+
+
+    def invalidate(self, sport=None):
+        with self._lock:
+            for key in list(self._entries):
+                if sport is None or key[0] == sport:
+                    del self._entries[key]
+
+
+    def _fetch(self, key, params, entry):
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = client.get(SCOREBOARD_URLS[key[0]], params=params, headers=headers)
+        self.requests_made += 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 304 and entry is not None:
+            # unchanged since the last download, keep the cached copy and
+            # what was already parsed from it
+            data = entry['data']
+            parsed = entry['parsed']
+            etag = etag or entry['etag']
+            last_modified = last_modified or entry['last_modified']
+        else:
+            response.raise_for_status()
+            # kept as text; each reading of it is parsed once, see parsed()
+            data = response.content.decode('utf-8')
+            parsed = {}
+
+        with self._lock:
+            self._entries[key] = {'data': data,
+                                  'fetched': time.monotonic(),
+                                  'etag': etag,
+                                  'last_modified': last_modified,
+                                  'stale': False,
+                                  'parsed': parsed}
+        return data
+
+
+scoreboards = ScoreboardCache()
+
+
+def get_scoreboard(sport, params=None):
+    # raw scoreboard JSON text
+    return scoreboards.get(sport, params)
+
+
+def _narrow_feeds(sport, wanted, today):
+    # one date + conference filtered scoreboard per group of followed teams
+    groups = set()
+    for team in wanted:
+        group = team_group(sport, team)
+        if group is None:
+            # a team we can't place in a conference needs the league scoreboard
+            return None
+        groups.add(group)
+    return [{'dates': today.strftime('%Y%m%d'), 'groups': group, 'limit': NARROW_LIMIT}
+            for group in sorted(groups)]
+
+
+def _games_from_feeds(sport, feeds, wanted, utc_offset, today):
+    games = {}
+    for feed in feeds:
+        parsed = scoreboards.parsed(sport, feed, ('games', frozenset(wanted), utc_offset, today),
+                                    lambda text: parse_games(text, sport, wanted, utc_offset, today))
+        # copies, the parsed games stay with the cached scoreboard
+        for game in (game.copy() for game in parsed):
+            game['feed'] = feed
+            game['stale'] = scoreboards.is_stale(sport, feed)
+            # two followed teams in different conferences can share a game
+            games.setdefault(game['id'], game)
+    return list(games.values())
 
 
 def get_current_games(sport, teams, utc_offset):
-    urls = {'nfl': 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard',
-            'nba': 'https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard',
-            'ncaafb': 'https://site.api.espn.com/apis/site/v2/sports/football/college-football/scoreboard',
-            'ncaabb': 'https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard',
-            'mlb': 'https://site.api.espn.com/apis/site/v2/sports/baseball/mlb/scoreboard'}
-
-    response = requests.get(urls[sport])
-    games = []
-    todays_date = datetime.now()
-    for event in response.json()['events']:
-        event_date = datetime.strptime(event['date'], '%Y-%m-%dT%H:%MZ') + timedelta(hours=utc_offset)
-        for team in teams:
-            if team in event['name'] and event_date.date() == todays_date.date():
-                competition = event['competitions'][0]
-                # store general game info
-                game = {'time': event_date.time(), 
-                        'status': event['status']['type']['name'],
-                        'clock': event['status']['displayClock'],
-                        'period': event['status']['period'],
-                        'sport': sport,
-                        'name': event['name']}
-                if sport == 'nfl' or sport == 'ncaafb':
-                    game['down'] = competition.get('situation', {}).get('shortDownDistanceText')
-                    game['spot'] = competition.get('situation', {}).get('possessionText')
-                    game['possession'] = competition.get('situation', {}).get('possession')
-                # store the individual team info
-                for competitor in competition['competitors']:
-                    if competitor['homeAway'] == 'home':
-                        game['home_location'] = competitor['team']['location']
-                        game['home_team'] = competitor['team']['name']
-                        game['home_logo'] = competitor['team']['logo']
-                        game['home_score'] = competitor['score']
-                        game['home_abbreviation'] = competitor['team']['abbreviation']
-                        game['home_color'] = competitor['team']['color']
-                    else:
-                        game['away_location'] = competitor['team']['location']
-                        game['away_team'] = competitor['team']['name']
-                        game['away_logo'] = competitor['team']['logo']
-                        game['away_score'] = competitor['score']
-                        game['away_abbreviation'] = competitor['team']['abbreviation']
-                        game['away_color'] = competitor['team']['color']
-
-                games.append(game)
+    wanted = resolve_teams(sport, teams)
+    today = datetime.now().date()
+    if sport in NARROW_SPORTS and wanted:
+        try:
+            feeds = _narrow_feeds(sport, wanted, today)
+            if feeds is not None:
+                return _games_from_feeds(sport, feeds, wanted, utc_offset, today)
+        except Exception as e:
+            logging.warning(f"Narrow {sport} query failed, using league scoreboard: {e}")
+    return _games_from_feeds(sport, [None], wanted, utc_offset, today)
 
-    return games
+
+def _apply_event(game, event):
+    competition = event['competitions'][0]
+    # Update the existing game dict with new values
+    game['status'] = event['status']['type']['name']
+    game['clock'] = event['status']['displayClock']
+    game['period'] = event['status']['period']
+    if game['sport'] == 'nfl' or game['sport'] == 'ncaafb':
+        game['down'] = competition.get('situation', {}).get('shortDownDistanceText')
+        game['spot'] = competition.get('situation', {}).get('possessionText')
+        game['possession'] = competition.get('situation', {}).get('possession')
+    for competitor in competition['competitors']:
+        if competitor['homeAway'] == 'home':
+            game['home_score'] = competitor['score']
+        else:
+            game['away_score'] = competitor['score']
 
 
 def update_game(game):
-    urls = {'nfl': 'https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard',
-            'nba': 'https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard',
-            'ncaafb': 'https://site.api.espn.com/apis/site/v2/sports/football/college-football/scoreboard',
-            'ncaabb': 'https://site.api.espn.com/apis/site/v2/sports/basketball/mens-college-basketball/scoreboard',
-            'mlb': 'https://site.api.espn.com/apis/site/v2/sports/baseball/mlb/scoreboard'}
-
-    response = requests.get(urls[game['sport']])
-    for event in response.json()['events']:
-        if event['name'] == game['name']:
-            competition = event['competitions'][0]
-            # Update the existing game dict with new values
-            game['clock'] = event['status']['displayClock']
-            game['period'] = event['status']['period']
-            if game['sport'] == 'nfl' or game['sport'] == 'ncaafb':
-                game['down'] = competition.get('situation', {}).get('shortDownDistanceText')
-                game['spot'] = competition.get('situation', {}).get('possessionText')
-                game['possession'] = competition.get('situation', {}).get('possession')
-            for competitor in competition['competitors']:
-                if competitor['homeAway'] == 'home':
-                    game['home_score'] = competitor['score']
-                else:
-                    game['away_score'] = competitor['score']
+    for event in iter_events(get_scoreboard(game['sport'], game.get('feed'))):
+        if event['id'] == game.get('id') or event['name'] == game['name']:
+            _apply_event(game, event)
 
     return game
 
 
+def update_games(games):
+    # refresh every tracked game with one scoreboard read per feed
+    by_feed = {}
+    for game in games:
+        feed = game.get('feed')
+        key = (game['sport'], tuple(sorted(feed.items())) if feed else ())
+        by_feed.setdefault(key, (feed, []))[1].append(game)
+
+    for (sport, _), (feed, feed_games) in by_feed.items():
+        ids = {game['id'] for game in feed_games}
+        try:
+            # only the tracked events are kept while streaming the scoreboard
+            events = scoreboards.parsed(sport, feed, ('events', frozenset(ids)),
+                                        lambda text: {event['id']: event for event in iter_events(text) if event['id'] in ids})
+        except Exception as e:
+            # one failing league leaves its games at their last known state
+            logging.warning(f"Could not update {sport} games: {e}")
+            events = {}
+        stale = scoreboards.is_stale(sport, feed)
+        for game in feed_games:
+            event = events.get(game.get('id'))
+            if event is not None:
+                _apply_event(game, event)
+            game['stale'] = stale or event is None
+
+    return games
+
+
 if __name__ == '__main__':
     UTC_OFFSET = -5
     NFL_TEAMS = ['Green Bay Packers']
@@ -0,0 +1,124 @@
+from sports_display.polling import PUSHED_INTERVAL
+import threading
+import time
+
+
+# port for the push endpoint; the web controller already uses 5000
+INGEST_PORT = 5001
+
+# fields a push may change on a tracked game; identity and team info stay
+# as discovered from ESPN
+PUSHABLE = {'status', 'clock', 'period', 'down', 'spot', 'possession', 'home_score', 'away_score'}
+
+# pushes for games the display isn't tracking are dropped after this long
+PENDING_TTL = 10 * 60
+
+# a pushed field outranks polled data for this long, unless ESPN catches up
+# with it sooner; the safety-net poll only takes over once pushes stop
+PUSH_HOLD = PUSHED_INTERVAL
+
+# what a pushed field may hold; down, spot and possession may be cleared
+# with null, the fields every screen draws or polls by may not
+PUSH_TYPES = (str, int, float, type(None))
+NOT_NULL = {'status', 'clock', 'period', 'home_score', 'away_score'}
+
+
+class PushInbox:
+    # latest pushed update per game id, handed to the display loop
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        # game id -> {field: (pushed value, monotonic time applied)}
+        self._held = {}
+        self._arrived = threading.Event()
+        self.received = 0
+
+
+    def put(self, updates):
+        # updates come in the shape get_current_games produces; returns the
+        # number accepted, raising ValueError on an update without id/sport
+        # or with a pushable field that isn't a plain value (or is null where
+        # it can't be). Fields other than PUSHABLE are ignored
+        for update in updates:
+            if not isinstance(update, dict) or 'id' not in update or 'sport' not in update:
+                raise ValueError("Each update needs at least 'id' and 'sport'")
+            if not isinstance(update['id'], (str, int)) or isinstance(update['id'], bool):
+                raise ValueError("'id' must be a string or a number")
+            for key in PUSHABLE & update.keys():
+                if not isinstance(update[key], PUSH_TYPES) or isinstance(update[key], bool):
+                    raise ValueError(f"'{key}' must be a string or a number")
+                if update[key] is None and key in NOT_NULL:
+                    raise ValueError(f"'{key}' can't be null")
+        now = time.monotonic()
+        with self._lock:
+            for game_id in [game_id for game_id, pending in self._pending.items()
+                            if now - pending['received'] > PENDING_TTL]:
+                del self._pending[game_id]
+            for update in updates:
+                pending = self._pending.setdefault(str(update['id']), {})
+                pending.update({key: value for key, value in update.items() if key in PUSHABLE})
+                # ESPN sends scores as strings and the renderers draw them as-is
+                for key in ('home_score', 'away_score'):
+                    if key in pending:
+                        pending[key] = str(pending[key])
+                pending['received'] = now
+            self.received += len(updates)
+        self._arrived.set()
+        return len(updates)
+
+
+    def wait(self, timeout):
+        # sleep up to timeout, waking early when a push arrives
+        arrived = self._arrived.wait(timeout)
+        self._arrived.clear()
+        return arrived
+
+
+    def apply(self, games):
+        # copy pending pushes onto the matching tracked games and return them;
+        # pushes for games not being tracked stay queued
+        applied = []
+        now = time.monotonic()
+        with self._lock:
+            for game in games:
+                update = self._pending.pop(str(game['id']), None)
+                if update is None:
+                    continue
+                update.pop('received')
+                held = self._held.setdefault(str(game['id']), {})
+                for key, value in update.items():
+                    game[key] = value
+                    held[key] = (value, now)
+                game['stale'] = False
+                applied.append(game)
+        return applied
+
+
+    def hold(self, games):
+        # after polled or rediscovered data was written onto games: put back
+        # pushed fields ESPN hasn't caught up with yet, so a lagging scoreboard
+        # can't roll a score back. A field is let go once ESPN agrees with it
+        # or it is older than PUSH_HOLD
+        now = time.monotonic()
+        with self._lock:
+            for game in games:
+                held = self._held.get(str(game['id']))
+                if not held:
+                    continue
+                for key, (value, applied) in list(held.items()):
+                    if game.get(key) == value or now - applied > PUSH_HOLD:
+                        del held[key]
+                    else:
+                        game[key] = value
+                if not held:
+                    del self._held[str(game['id'])]
+
+
+    def forget(self, games):
+        with self._lock:
+            for game in games:
+                self._held.pop(str(game['id']), None)
+
+
+inbox = PushInbox()
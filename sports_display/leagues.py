@@ -0,0 +1,112 @@
+from datetime import datetime
+from sports_display import client
+from sports_display.parse import read_key
+import json
+import logging
+import os
+import threading
+
+
+# ESPN host; point it at sports_display/replay.py to run against recorded
+# fixtures instead of the live API
+ESPN_ROOT = os.environ.get('ESPN_ROOT', 'https://site.api.espn.com').rstrip('/')
+
+# ESPN site API path for every league the display follows
+LEAGUE_PATHS = {'nfl': '/apis/site/v2/sports/football/nfl',
+                'nba': '/apis/site/v2/sports/basketball/nba',
+                'ncaafb': '/apis/site/v2/sports/football/college-football',
+                'ncaabb': '/apis/site/v2/sports/basketball/mens-college-basketball',
+                'mlb': '/apis/site/v2/sports/baseball/mlb'}
+
+LEAGUE_URLS = {sport: ESPN_ROOT + path for sport, path in LEAGUE_PATHS.items()}
+
+SEASON_FILE = '/tmp/sports_seasons.json'
+
+# ESPN season type for the off season (1 pre, 2 regular, 3 post)
+OFF_SEASON = 4
+
+_lock = threading.Lock()
+# sport -> {'checked', 'in_season', 'resume'} with ISO date strings
+_seasons = None
+
+
+def _parse_date(value):
+    return datetime.strptime(value[:10], '%Y-%m-%d').date()
+
+
+def _season_state(league, today):
+    # (in_season, resume) from the league block of a scoreboard response;
+    # resume is the next date a non-off-season calendar entry starts, if known
+    season_type = league.get('season', {}).get('type', {}).get('type')
+    if season_type is not None:
+        in_season = int(season_type) != OFF_SEASON
+    elif 'calendarStartDate' in league and 'calendarEndDate' in league:
+        in_season = _parse_date(league['calendarStartDate']) <= today <= _parse_date(league['calendarEndDate'])
+    else:
+        in_season = True
+
+    resume = None
+    if not in_season:
+        for entry in league.get('calendar', []):
+            # football-style calendars list season types with date ranges;
+            # day-list calendars (basketball, baseball) are plain strings
+            if isinstance(entry, dict) and str(entry.get('value')) != str(OFF_SEASON) and 'startDate' in entry:
+                start = _parse_date(entry['startDate'])
+            elif isinstance(entry, str):
+                start = _parse_date(entry)
+            else:
+                continue
+            if start > today and (resume is None or start < resume):
+                resume = start
+    return in_season, resume
+
+
+def _load():
+    global _seasons
+    if _seasons is None:
+        try:
+            with open(SEASON_FILE, 'r') as f:
+                _seasons = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _seasons = {}
+    return _seasons
+
+
+def _save(seasons):
+    try:
+        with open(SEASON_FILE, 'w') as f:
+            json.dump(seasons, f)
+    except OSError as e:
+        logging.warning(f"Could not save season calendar: {e}")
+
+
+def in_season(sport, today):
+    # checked at most once a day per league; an out-of-season league with a
+    # known start date isn't asked again until that date
+    with _lock:
+        state = _load().get(sport)
+    if state is not None:
+        if state['checked'] == today.isoformat():
+            return state['in_season']
+        if not state['in_season'] and state['resume'] and _parse_date(state['resume']) > today:
+            return False
+
+    try:
+        response = client.get(LEAGUE_URLS[sport] + '/scoreboard', params={'limit': 1})
+        response.raise_for_status()
+        leagues = read_key(response.content.decode('utf-8'), 'leagues') or [{}]
+        active, resume = _season_state(leagues[0], today)
+    except Exception as e:
+        # never hide a league just because its calendar couldn't be read
+        logging.warning(f"Could not read {sport} season calendar: {e}")
+        return True
+
+    if not active:
+        logging.info(f"{sport} is out of season" + (f" until {resume}" if resume else ""))
+    with _lock:
+        seasons = _load()
+        seasons[sport] = {'checked': today.isoformat(),
+                          'in_season': active,
+                          'resume': resume.isoformat() if resume else None}
+        _save(seasons)
+    return active
@@ -0,0 +1,237 @@
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont
+from sports_display import client
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+
+LOGO_DIR = '/tmp/sports_logos'
+
+# every logo is drawn as a 32x32 square on either end of the panel
+LOGO_SIZE = (32, 32)
+
+# decoded logos kept in memory; a full slate of followed games needs a
+# handful, the headroom covers multi-game layouts
+MEMORY_SLOTS = 64
+
+# a logo on disk is trusted this long before asking ESPN whether it changed
+REVALIDATE_AFTER = 24 * 60 * 60
+
+# a logo that failed to load is tried again after this many seconds,
+# doubling per failure up to the maximum
+FAILURE_BACKOFF = 60
+FAILURE_MAX_BACKOFF = 60 * 60
+
+# tile color for teams without one in the payload
+PLACEHOLDER_COLOR = '808080'
+
+
+def _rgb(color):
+    try:
+        return tuple(int(color[i:i+2], 16) for i in (0, 2, 4))
+    except (TypeError, ValueError):
+        return _rgb(PLACEHOLDER_COLOR)
+
+
+_placeholders = {}
+
+
+def placeholder(abbreviation, color, size=LOGO_SIZE):
+    # stand-in for a logo that hasn't been fetched yet: the team abbreviation
+    # on a tile of the team color
+    key = (abbreviation, color, tuple(size))
+    tile = _placeholders.get(key)
+    if tile is None:
+        rgb = _rgb(color)
+        tile = Image.new("RGB", key[2], rgb)
+        draw = ImageDraw.Draw(tile)
+        font = ImageFont.load_default()
+        left, top, right, bottom = draw.textbbox((0, 0), abbreviation or '', font=font)
+        # dark text on light team colors, white otherwise
+        text = (0, 0, 0) if sum(rgb) > 3 * 160 else (255, 255, 255)
+        draw.text(((key[2][0] - (right - left)) // 2 - left, (key[2][1] - (bottom - top)) // 2 - top),
+                  abbreviation or '', fill=text, font=font)
+        _placeholders[key] = tile
+    return tile
+
+
+class LogoCache:
+    # resized RGB logos in a bounded LRU keyed by (url, size), backed by the
+    # original image files on disk, which are revalidated with ETag
+
+    def __init__(self, directory=LOGO_DIR, slots=MEMORY_SLOTS, revalidate_after=REVALIDATE_AFTER):
+        self.directory = directory
+        self.slots = slots
+        self.revalidate_after = revalidate_after
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.downloads = 0
+        # (url, size) waiting for the prefetch worker
+        self._queued = set()
+        # (url, size) -> (monotonic time it may be tried again, last backoff)
+        self._failed = {}
+        self._queue = queue.Queue()
+        self._worker = None
+
+
+    def ready(self, url, size=LOGO_SIZE):
+        # the logo if it is already decoded, otherwise None with a fetch
+        # queued (unless it recently failed); never touches disk or network
+        # on the caller's thread
+        key = (url, tuple(size))
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+        self.prefetch([url], size)
+        return None
+
+
+    def peek(self, url, size=LOGO_SIZE):
+        # the logo if it is decoded, without counting a hit or queueing a fetch
+        with self._lock:
+            return self._images.get((url, tuple(size)))
+
+
+    def put(self, url, image, size=LOGO_SIZE):
+        # seed an already decoded logo, e.g. one kept across a restart
+        key = (url, tuple(size))
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.slots:
+                self._images.popitem(last=False)
+
+
+    def prefetch(self, urls, size=LOGO_SIZE):
+        # load logos on the background worker so they're decoded before
+        # drawing; logos still backing off from a failure are skipped
+        now = time.monotonic()
+        with self._lock:
+            for url in urls:
+                key = (url, tuple(size))
+                if key in self._failed and now < self._failed[key][0]:
+                    continue
+                if url and key not in self._images and key not in self._queued:
+                    self._queued.add(key)
+                    self._queue.put(key)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._prefetch_worker, daemon=True)
+                self._worker.start()
+
+
+    def _prefetch_worker(self):
+        while True:
+            url, size = self._queue.get()
+            try:
+                self.get(url, size)
+                with self._lock:
+                    self._failed.pop((url, size), None)
+            except Exception as e:
+                # left to the placeholder until the backoff runs out
+                with self._lock:
+                    previous = self._failed.get((url, size))
+                    backoff = min(previous[1] * 2, FAILURE_MAX_BACKOFF) if previous else FAILURE_BACKOFF
+                    self._failed[(url, size)] = (time.monotonic() + backoff, backoff)
+                logging.warning(f"Could not prefetch logo {url}, retrying in {backoff}s: {e}")
+            finally:
+                with self._lock:
+                    self._queued.discard((url, size))
+
+
+    def get(self, url, size=LOGO_SIZE):
+        key = (url, tuple(size))
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        image = Image.open(BytesIO(self._original(url))).resize(key[1], 1).convert("RGB")
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.slots:
+                self._images.popitem(last=False)
+        return image
+
+
+    def _paths(self, url):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name), os.path.join(self.directory, name + '.json')
+
+
+    def _original(self, url):
+        # image bytes from disk, downloading or revalidating them when needed
+        image_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(image_path, 'rb') as f:
+                content = f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            meta, content = None, None
+
+        if meta is not None and time.time() - meta['checked'] < self.revalidate_after:
+            return content
+
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        try:
+            response = client.get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+        except Exception as e:
+            if content is None:
+                raise
+            logging.warning(f"Could not revalidate logo {url}, using the copy on disk: {e}")
+            return content
+
+        if response.status_code == 304:
+            meta['checked'] = time.time()
+        else:
+            with self._lock:
+                self.downloads += 1
+            content = response.content
+            meta = {'url': url,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'checked': time.time()}
+        self._write(image_path, meta_path, content, meta)
+        return content
+
+
+    def _write(self, image_path, meta_path, content, meta):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(image_path, 'wb') as f:
+                f.write(content)
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        except OSError as e:
+            logging.warning(f"Could not save logo to {self.directory}: {e}")
+
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'downloads': self.downloads,
+                    'cached': len(self._images), 'queued': len(self._queued), 'failed': len(self._failed)}
+
+
+logo_cache = LogoCache()
@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta, time as dt_time
+from json.decoder import scanstring
+import json
+import re
+
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+class Game:
+    __slots__ = ('id', 'sport', 'name', 'time', 'status', 'clock', 'period', 'stale', 'feed',
+                 'down', 'spot', 'possession',
+                 'home_id', 'home_location', 'home_team', 'home_logo', 'home_score', 'home_abbreviation', 'home_color',
+                 'away_id', 'away_location', 'away_team', 'away_logo', 'away_score', 'away_abbreviation', 'away_color')
+
+    def __init__(self, **fields):
+        # fields that were never set behave like missing dict keys
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    # dict-style access keeps game['home_score'] / game.get('down') working
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__ if hasattr(self, key)}
+
+    # independent copy, safe to hand to another thread
+    def copy(self):
+        return type(self)(**self.as_dict())
+
+    # JSON-safe copy for files under /tmp; the start time is kept as HH:MM:SS
+    def to_json(self):
+        data = self.as_dict()
+        if data.get('time') is not None:
+            data['time'] = data['time'].isoformat()
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        data = dict(data)
+        if data.get('time') is not None:
+            data['time'] = dt_time.fromisoformat(data['time'])
+        return cls(**{key: value for key, value in data.items() if key in cls.__slots__})
+
+    def __repr__(self):
+        return f"Game({self.as_dict()})"
+
+
+def _skip(text, idx):
+    return _whitespace.match(text, idx).end()
+
+
+def _expect(text, idx, char):
+    if idx >= len(text) or text[idx] != char:
+        raise ValueError(f"Expected '{char}' at position {idx} of scoreboard")
+    return idx + 1
+
+
+def _walk(text):
+    # yields (key, idx) for every top-level key, leaving idx at its value;
+    # the caller returns the index just past the value it consumed
+    idx = _expect(text, _skip(text, 0), '{')
+    idx = _skip(text, idx)
+    if text[idx:idx + 1] == '}':
+        return
+    while True:
+        key, idx = scanstring(text, _expect(text, idx, '"'))
+        idx = _skip(text, _expect(text, _skip(text, idx), ':'))
+        idx = yield key, idx
+        idx = _skip(text, idx)
+        if text[idx:idx + 1] == ',':
+            idx = _skip(text, idx + 1)
+        else:
+            _expect(text, idx, '}')
+            return
+
+
+def iter_events(text):
+    # decode the scoreboard one event at a time instead of materializing the
+    # whole document; other top-level keys are decoded and dropped
+    walker = _walk(text)
+    try:
+        key, idx = next(walker)
+        while True:
+            if key == 'events':
+                idx = _skip(text, _expect(text, idx, '['))
+                while text[idx:idx + 1] != ']':
+                    event, idx = _decoder.raw_decode(text, idx)
+                    yield event
+                    idx = _skip(text, idx)
+                    if text[idx:idx + 1] == ',':
+                        idx = _skip(text, idx + 1)
+                    else:
+                        _expect(text, idx, ']')
+                idx += 1
+            else:
+                _, idx = _decoder.raw_decode(text, idx)
+            key, idx = walker.send(idx)
+    except StopIteration:
+        return
+
+
+def read_key(text, wanted):
+    # value of one top-level key; keys before it are decoded and dropped
+    walker = _walk(text)
+    try:
+        key, idx = next(walker)
+        while True:
+            value, idx = _decoder.raw_decode(text, idx)
+            if key == wanted:
+                return value
+            key, idx = walker.send(idx)
+    except StopIteration:
+        return None
+
+
+def followed(competition, wanted):
+    for competitor in competition['competitors']:
+        team = competitor['team']
+        if team['id'] in wanted or team.get('displayName') in wanted:
+            return True
+    return False
+
+
+def parse_game(event, sport, event_date):
+    competition = event['competitions'][0]
+    # store general game info
+    game = Game(time=event_date.time(),
+                status=event['status']['type']['name'],
+                clock=event['status']['displayClock'],
+                period=event['status']['period'],
+                sport=sport,
+                id=event['id'],
+                name=event['name'])
+    if sport == 'nfl' or sport == 'ncaafb':
+        situation = competition.get('situation', {})
+        game.down = situation.get('shortDownDistanceText')
+        game.spot = situation.get('possessionText')
+        game.possession = situation.get('possession')
+    # store the individual team info
+    for competitor in competition['competitors']:
+        team = competitor['team']
+        side = 'home' if competitor['homeAway'] == 'home' else 'away'
+        game[side + '_location'] = team['location']
+        game[side + '_id'] = team['id']
+        game[side + '_team'] = team['name']
+        game[side + '_logo'] = team['logo']
+        game[side + '_score'] = competitor['score']
+        game[side + '_abbreviation'] = team['abbreviation']
+        game[side + '_color'] = team['color']
+    return game
+
+
+def parse_games(text, sport, wanted, utc_offset, today):
+    games = []
+    for event in iter_events(text):
+        # cheap id check first; dates are only parsed for followed teams
+        if not followed(event['competitions'][0], wanted):
+            continue
+        event_date = datetime.strptime(event['date'], '%Y-%m-%dT%H:%MZ') + timedelta(hours=utc_offset)
+        if event_date.date() == today:
+            games.append(parse_game(event, sport, event_date))
+    return games
@@ -0,0 +1,145 @@
+from sports_display.schedule import DONE_STATUSES
+import threading
+import time
+
+
+# seconds between scoreboard polls for a game in each situation
+CRUNCH_INTERVAL = 5     # clock running late in a close game, or overtime
+LIVE_INTERVAL = 15      # clock running; the screen clock ticks locally in between
+BREAK_INTERVAL = 30     # clock stopped: timeouts, reviews, between periods
+BLOWOUT_INTERVAL = 30   # late in a game that is no longer close
+HALFTIME_INTERVAL = 60
+DELAY_INTERVAL = 120    # weather / rain delays
+SCHEDULED_INTERVAL = 60
+
+# while a game gets pushed updates (sports_display/ingest.py) polling only
+# runs as a slow safety net
+PUSHED_INTERVAL = 60
+PUSH_FRESHNESS = 90
+
+BREAK_STATUSES = {'STATUS_END_PERIOD'}
+HALFTIME_STATUSES = {'STATUS_HALFTIME'}
+DELAY_STATUSES = {'STATUS_DELAYED', 'STATUS_RAIN_DELAY', 'STATUS_SUSPENDED'}
+
+# sport -> (regulation periods, close margin, blowout margin)
+GAME_SHAPE = {'nfl': (4, 8, 24),
+              'ncaafb': (4, 8, 28),
+              'nba': (4, 10, 25),
+              'ncaabb': (2, 10, 25),
+              'mlb': (9, 3, 8)}
+
+# sports whose displayClock actually runs
+CLOCK_SPORTS = {'nfl', 'ncaafb', 'nba', 'ncaabb'}
+
+
+def _score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PollScheduler:
+    # per-game poll cadence from status, period, score margin and whether the
+    # clock moved since the previous poll; clock is injectable for testing
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        # game id -> {'clock', 'period', 'interval', 'due', 'pushed'}
+        self._games = {}
+
+
+    def _interval(self, game, previous):
+        status = game['status']
+        if status in DONE_STATUSES:
+            return None
+        if status == 'STATUS_SCHEDULED':
+            return SCHEDULED_INTERVAL
+        if status in HALFTIME_STATUSES:
+            return HALFTIME_INTERVAL
+        if status in DELAY_STATUSES:
+            return DELAY_INTERVAL
+        if status in BREAK_STATUSES:
+            return BREAK_INTERVAL
+
+        sport = game['sport']
+        if sport in CLOCK_SPORTS and previous is not None \
+                and previous['period'] == game.get('period') and previous['clock'] == game.get('clock'):
+            # clock didn't move since the last poll: stoppage
+            return BREAK_INTERVAL
+
+        periods, close, blowout = GAME_SHAPE.get(sport, (4, 8, 24))
+        period = game.get('period') or 0
+        margin = abs(_score(game.get('home_score')) - _score(game.get('away_score')))
+        if period > periods:
+            return CRUNCH_INTERVAL
+        if period == periods:
+            if margin <= close:
+                return CRUNCH_INTERVAL
+            if margin >= blowout:
+                return BLOWOUT_INTERVAL
+        return LIVE_INTERVAL
+
+
+    def observe(self, game, pushed=False):
+        # record a fresh reading of the game and schedule its next poll
+        now = self.clock()
+        with self._lock:
+            previous = self._games.get(game['id'])
+            interval = self._interval(game, previous)
+            pushed_at = now if pushed else (previous or {}).get('pushed')
+            if interval is not None and pushed_at is not None and now - pushed_at < PUSH_FRESHNESS:
+                interval = max(interval, PUSHED_INTERVAL)
+            self._games[game['id']] = {'clock': game.get('clock'),
+                                       'period': game.get('period'),
+                                       'interval': interval,
+                                       'due': None if interval is None else now + interval,
+                                       'pushed': pushed_at}
+            return interval
+
+
+    def track(self, games):
+        # start the cadence for games seen for the first time
+        for game in games:
+            with self._lock:
+                known = game['id'] in self._games
+            if not known:
+                self.observe(game)
+
+
+    def interval(self, game):
+        # effective poll interval in seconds, None once the game is done
+        with self._lock:
+            state = self._games.get(game['id'])
+            return None if state is None else state['interval']
+
+
+    def intervals(self, games):
+        return {game['id']: self.interval(game) for game in games}
+
+
+    def due(self, games):
+        now = self.clock()
+        with self._lock:
+            return [game for game in games
+                    if game['id'] in self._games
+                    and self._games[game['id']]['due'] is not None
+                    and self._games[game['id']]['due'] <= now]
+
+
+    def seconds_until_due(self, games):
+        # None when no game needs polling any more
+        now = self.clock()
+        with self._lock:
+            dues = [self._games[game['id']]['due'] for game in games
+                    if game['id'] in self._games and self._games[game['id']]['due'] is not None]
+        if not dues:
+            return None
+        return max(0, min(dues) - now)
+
+
+    def forget(self, games):
+        with self._lock:
+            for game in games:
+                self._games.pop(game['id'], None)
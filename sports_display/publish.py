@@ -0,0 +1,44 @@
+import sys
+import os
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sports_display.ingest import INGEST_PORT
+import argparse
+import json
+import requests
+
+
+def publish(url, updates):
+    response = requests.post(url, json=updates, timeout=5)
+    print(f"{response.status_code} {response.text.strip()}")
+    return response.status_code == 202
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Push score/state updates to a running sports display.")
+    parser.add_argument('--url', default=f"http://localhost:{INGEST_PORT}/games")
+    parser.add_argument('--file', help="JSON file with one game object or a list of them")
+    parser.add_argument('--id', help="ESPN event id")
+    parser.add_argument('--sport', help="nfl, ncaafb, nba, ncaabb or mlb")
+    parser.add_argument('--status')
+    parser.add_argument('--clock')
+    parser.add_argument('--period', type=int)
+    parser.add_argument('--home-score')
+    parser.add_argument('--away-score')
+    parser.add_argument('--possession', help="ESPN team id with the ball")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'r') as f:
+            updates = json.load(f)
+    else:
+        if not args.id or not args.sport:
+            parser.error("--id and --sport are required without --file")
+        fields = {'id': args.id, 'sport': args.sport, 'status': args.status, 'clock': args.clock,
+                  'period': args.period, 'home_score': args.home_score, 'away_score': args.away_score,
+                  'possession': args.possession}
+        updates = {key: value for key, value in fields.items() if value is not None}
+
+    sys.exit(0 if publish(args.url, updates) else 1)
@@ -0,0 +1,97 @@
+import sys
+import os
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from datetime import datetime, timezone
+from sports_display import client
+from sports_display.leagues import LEAGUE_URLS
+from sports_display.parse import iter_events
+import argparse
+import gzip
+import json
+
+
+# bump when the manifest or file layout changes; older recordings stay in
+# their own directory so benchmarks keep comparing like with like
+FIXTURE_VERSION = 1
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', f'v{FIXTURE_VERSION}')
+MANIFEST_FILE = 'manifest.json'
+
+
+def load_manifest(directory=FIXTURE_DIR):
+    # fixture name -> {'file', 'sport', 'params', 'date', 'teams', 'games', ...}
+    with open(os.path.join(directory, MANIFEST_FILE), 'r') as f:
+        return json.load(f)['fixtures']
+
+
+def load_fixture(name, directory=FIXTURE_DIR):
+    # raw scoreboard text exactly as it was recorded
+    entry = load_manifest(directory)[name]
+    with gzip.open(os.path.join(directory, entry['file']), 'rt', encoding='utf-8') as f:
+        return f.read()
+
+
+def _save_manifest(fixtures, directory):
+    with open(os.path.join(directory, MANIFEST_FILE), 'w') as f:
+        json.dump({'version': FIXTURE_VERSION, 'fixtures': fixtures}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def record(name, sport, teams, params=None, truncate=None, note='', directory=FIXTURE_DIR):
+    # fetch one live scoreboard and store it with the metadata the replay
+    # server and benchmarks need; truncate keeps only that fraction of the
+    # body to capture a malformed payload
+    url = LEAGUE_URLS[sport] + '/scoreboard'
+    response = client.get(url, params=params)
+    response.raise_for_status()
+    text = response.content.decode('utf-8')
+
+    # the UTC day the slate was played, so replays can move it to today
+    dates = sorted(event['date'][:10] for event in iter_events(text))
+    followed = None
+    if truncate is not None:
+        text = text[:int(len(text) * truncate)]
+    else:
+        followed = sum(1 for event in iter_events(text)
+                       if any(competitor['team']['id'] in teams
+                              for competitor in event['competitions'][0]['competitors']))
+
+    os.makedirs(directory, exist_ok=True)
+    filename = name + '.json.gz'
+    with gzip.open(os.path.join(directory, filename), 'wt', encoding='utf-8') as f:
+        f.write(text)
+
+    try:
+        fixtures = load_manifest(directory)
+    except FileNotFoundError:
+        fixtures = {}
+    fixtures[name] = {'file': filename,
+                      'sport': sport,
+                      'params': params or {},
+                      'date': dates[0] if dates else None,
+                      'teams': list(teams),
+                      # followed games parse_games should find, None for malformed payloads
+                      'games': followed,
+                      'recorded': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%MZ'),
+                      'source': url,
+                      'note': note}
+    _save_manifest(fixtures, directory)
+    return fixtures[name]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record an ESPN scoreboard response as a replay fixture.")
+    parser.add_argument('name', help="fixture name, e.g. live_game")
+    parser.add_argument('sport', choices=sorted(LEAGUE_URLS))
+    parser.add_argument('--team-id', action='append', default=[], required=True, help="followed ESPN team id")
+    parser.add_argument('--param', action='append', default=[], help="scoreboard query parameter as key=value")
+    parser.add_argument('--truncate', type=float, help="keep only this fraction of the body (malformed fixtures)")
+    parser.add_argument('--note', default='')
+    parser.add_argument('--dir', default=FIXTURE_DIR)
+    args = parser.parse_args()
+
+    params = dict(param.split('=', 1) for param in args.param)
+    entry = record(args.name, args.sport, args.team_id, params, args.truncate, args.note, args.dir)
+    print(json.dumps(entry, indent=2))
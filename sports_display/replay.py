@@ -0,0 +1,145 @@
+import sys
+import os
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from sports_display.leagues import LEAGUE_PATHS
+from sports_display.recordings import FIXTURE_DIR, load_fixture, load_manifest
+from urllib.parse import urlsplit
+import argparse
+import hashlib
+import logging
+import random
+import threading
+import time
+
+
+REPLAY_PORT = 8765
+
+
+class ReplayServer:
+    # serves recorded scoreboards on ESPN's paths so the display, or a
+    # benchmark, can run with ESPN_ROOT=http://localhost:<port>; latency and
+    # error rate are configurable to exercise retries and the circuit breaker
+
+    def __init__(self, fixtures, port=REPLAY_PORT, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, rebase_dates=True, directory=FIXTURE_DIR, seed=None):
+        # fixtures: sport -> fixture name
+        manifest = load_manifest(directory)
+        today = datetime.now().date().isoformat()
+        self.routes = {}
+        for sport, name in fixtures.items():
+            text = load_fixture(name, directory)
+            if rebase_dates and manifest[name]['date']:
+                # move the recorded slate onto today so get_current_games picks it up
+                text = text.replace(f'"{manifest[name]["date"]}T', f'"{today}T')
+            body = text.encode('utf-8')
+            self.routes[LEAGUE_PATHS[sport] + '/scoreboard'] = (body, '"' + hashlib.md5(body).hexdigest() + '"')
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.served = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('localhost', port), self._handler())
+        self.httpd.daemon_threads = True
+
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.httpd.server_address[1]}"
+
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.respond(self)
+
+
+            def log_message(self, format, *args):
+                logging.debug("replay: " + format % args)
+
+        return Handler
+
+
+    def respond(self, request):
+        with self._lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            fail = self.random.random() < self.error_rate
+            self.served += 1
+            if fail:
+                self.errors += 1
+        time.sleep(delay)
+
+        route = self.routes.get(urlsplit(request.path).path)
+        if fail or route is None:
+            request.send_response(self.error_status if fail else 404)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        body, etag = route
+        if request.headers.get('If-None-Match') == etag:
+            request.send_response(304)
+            request.send_header('ETag', etag)
+            request.end_headers()
+            return
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/json;charset=UTF-8')
+        request.send_header('Content-Length', str(len(body)))
+        request.send_header('ETag', etag)
+        request.end_headers()
+        request.wfile.write(body)
+
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def default_fixtures(directory=FIXTURE_DIR):
+    # the first well-formed fixture of each sport, by name
+    fixtures = {}
+    for name, entry in sorted(load_manifest(directory).items()):
+        if entry['games'] is not None:
+            fixtures.setdefault(entry['sport'], name)
+    return fixtures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve recorded ESPN scoreboards on their live paths.")
+    parser.add_argument('--port', type=int, default=REPLAY_PORT)
+    parser.add_argument('--fixture', action='append', default=[], help="sport=fixture to serve, e.g. ncaabb=malformed")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="random +/- seconds around the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--keep-dates', action='store_true', help="serve event dates as recorded instead of today")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--dir', default=FIXTURE_DIR)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(message)s")
+
+    fixtures = default_fixtures(args.dir)
+    fixtures.update(dict(choice.split('=', 1) for choice in args.fixture))
+    server = ReplayServer(fixtures, args.port, args.latency, args.jitter, args.error_rate,
+                          args.error_status, not args.keep_dates, args.dir, args.seed)
+    for sport, name in sorted(fixtures.items()):
+        print(f"{sport:7} {name}")
+    print(f"Run the display with ESPN_ROOT={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
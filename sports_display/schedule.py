@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from sports_display.parse import Game
+import json
+import logging
+
+
+SCHEDULE_FILE = '/tmp/sports_schedule.json'
+
+# start polling this long before the first pitch / tip-off / kickoff
+PREGAME_LEAD = timedelta(minutes=10)
+
+# when tomorrow's schedule gets built
+REBUILD_TIME = timedelta(minutes=5)
+
+# a day with no followed games is discovered again this often instead of
+# waiting for tomorrow, in case ESPN adds one; a day where a league didn't
+# answer, sooner
+RECHECK_INTERVAL = timedelta(hours=1)
+INCOMPLETE_RETRY = timedelta(minutes=5)
+
+DONE_STATUSES = {'STATUS_FINAL', 'STATUS_POSTPONED', 'STATUS_CANCELED'}
+
+
+class DailySchedule:
+    # the day's followed games, fetched once and persisted so the display
+    # only polls ESPN from shortly before each start until everything is final.
+    # complete is False when a league failed to answer the discovery at
+    # discovered (a datetime)
+
+    def __init__(self, date, teams, games, complete=True, discovered=None):
+        self.date = date
+        self.teams = teams
+        self.games = games
+        self.complete = complete
+        self.discovered = discovered or datetime.now()
+
+
+    def covers(self, date, teams):
+        return self.date == date and self.teams == teams
+
+
+    def update(self, games, complete=True):
+        self.games = games
+        self.complete = complete
+        self.discovered = datetime.now()
+
+
+    def _start(self, game):
+        return datetime.combine(self.date, game['time'])
+
+
+    def pending(self):
+        return [game for game in self.games if game['status'] not in DONE_STATUSES]
+
+
+    def _recheck(self):
+        # when to discover again because the day may be missing games
+        if not self.complete:
+            return self.discovered + INCOMPLETE_RETRY
+        if not self.games:
+            return self.discovered + RECHECK_INTERVAL
+        return None
+
+
+    def polled(self, game, now):
+        # from its pregame lead (or once it started, whatever its listed time)
+        # until it is done a game is refreshed by the poller instead of by
+        # discovery
+        if game['status'] in DONE_STATUSES:
+            return False
+        return game['status'] != 'STATUS_SCHEDULED' or self._start(game) - PREGAME_LEAD <= now
+
+
+    def discovery_due(self, now):
+        recheck = self._recheck()
+        return recheck is not None and recheck <= now
+
+
+    def next_plan(self, now):
+        # datetime the day needs looking at again: the next pregame lead of a
+        # game not polled yet, and tomorrow once there is none; no later than
+        # the recheck of an empty or incomplete day
+        leads = [self._start(game) - PREGAME_LEAD for game in self.pending()]
+        upcoming = [lead for lead in leads if lead > now]
+        if upcoming:
+            next_plan = min(upcoming)
+        else:
+            next_plan = datetime.combine(self.date + timedelta(days=1), datetime.min.time()) + REBUILD_TIME
+        recheck = self._recheck()
+        if recheck is not None:
+            next_plan = min(next_plan, recheck)
+        return max(now, next_plan)
+
+
+    def seconds_until_plan(self, now):
+        return (self.next_plan(now) - now).total_seconds()
+
+
+    def save(self, path=SCHEDULE_FILE):
+        # only a day every league answered for is worth reloading after a restart
+        if not self.complete:
+            return
+        try:
+            with open(path, 'w') as f:
+                json.dump({'date': self.date.isoformat(),
+                           'teams': self.teams,
+                           'discovered': self.discovered.isoformat(),
+                           'games': [game.to_json() for game in self.games]}, f)
+        except OSError as e:
+            logging.warning(f"Could not save schedule: {e}")
+
+
+def load_schedule(date, teams, path=SCHEDULE_FILE):
+    # today's schedule from disk, or None if it is missing, old or for other teams
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        schedule = DailySchedule(datetime.strptime(data['date'], '%Y-%m-%d').date(),
+                                 data['teams'],
+                                 [Game.from_json(game) for game in data['games']],
+                                 discovered=datetime.fromisoformat(data.get('discovered', datetime.min.isoformat())))
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+        return None
+    return schedule if schedule.covers(date, teams) else None
@@ -0,0 +1,54 @@
+import time
+
+
+class Deadlines:
+    # named deadlines on a single clock; the display loop sleeps until the
+    # earliest one and runs whatever came due. clock and sleep are injectable
+    # for testing
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self._due = {}
+
+
+    def set(self, name, seconds):
+        # due that many seconds from now, replacing any earlier deadline
+        self._due[name] = self.clock() + max(0, seconds)
+
+
+    def cancel(self, name):
+        self._due.pop(name, None)
+
+
+    def clear(self):
+        self._due.clear()
+
+
+    def due(self, name):
+        when = self._due.get(name)
+        return when is not None and when <= self.clock()
+
+
+    def remaining(self, name):
+        when = self._due.get(name)
+        return None if when is None else max(0, when - self.clock())
+
+
+    def until_next(self):
+        # seconds until the earliest deadline, None when nothing is scheduled
+        if not self._due:
+            return None
+        return max(0, min(self._due.values()) - self.clock())
+
+
+    def wait(self, wake=None):
+        # sleep until the next deadline; wake(seconds) may return early (and
+        # truthy) when something outside the schedule needs attention, and
+        # with nothing scheduled it is waited on until it does
+        seconds = self.until_next()
+        if seconds is None:
+            return wake(None) if wake else False
+        if seconds <= 0:
+            return False
+        return (wake or self.sleep)(seconds)
@@ -0,0 +1,134 @@
+from common.layouts import Layout, Text, Picture, Box, Dots, Rows, PANEL_SIZE
+from sports_display.logos import logo_cache, placeholder
+
+
+FONT_PATH = '/home/sunderwood/led-display/rpi-rgb-led-matrix/fonts/'
+FONT_SMALL = FONT_PATH + '5x8.bdf'
+FONT_LARGE = FONT_PATH + '8x13B.bdf'
+FONT_BANNER = FONT_PATH + '9x15B.bdf'
+
+WHITE = (255, 255, 255)
+POSSESSION = (255, 255, 0)
+HIGHLIGHT = (255, 255, 0)
+STALE = (255, 0, 0)
+
+# middle of the away and home columns between the logos
+AWAY_CENTER = 46
+HOME_CENTER = 82
+
+
+# logos on either end, abbreviations and '@' on the row at baseline; all of
+# it goes into the cached background. A logo that isn't decoded yet shows
+# as a tile in the team color. possession colors the team with the ball
+def _teams(baseline, possession=False):
+    away, home = ('away_color', 'home_color') if possession else (WHITE, WHITE)
+    return [Picture('away_logo', 0, 0),
+            Picture('home_logo', 96, 0),
+            Text(FONT_LARGE, AWAY_CENTER, baseline, 'away_abbreviation', color=away, align='center', static=True),
+            Text(FONT_LARGE, HOME_CENTER, baseline, 'home_abbreviation', color=home, align='center', static=True),
+            Text(FONT_LARGE, 60, baseline, text='@', static=True)]
+
+
+SCORES = [Text(FONT_LARGE, AWAY_CENTER, 12, 'away_score', align='center'),
+          Text(FONT_LARGE, HOME_CENTER, 12, 'home_score', align='center')]
+
+# yellow frame around the score while a change is being highlighted, red
+# dot top-center while the data behind the screen is out of date
+OVERLAYS = [Box(32, 0, 95, 31, HIGHLIGHT, when='highlight'),
+            Dots([(63, 0), (64, 0)], STALE, when='stale')]
+
+PREGAME = Layout('pregame', _teams(28) + [
+    Text(FONT_LARGE, 34, 14, 'start'),
+    Text(FONT_LARGE, 78, 14, 'meridiem'),
+] + OVERLAYS)
+
+LIVE_FOOTBALL = Layout('live football', _teams(30, possession=True) + SCORES + [
+    Text(FONT_SMALL, 64, 19, 'clock', align='center'),
+    Text(FONT_SMALL, 61, 12, 'period', fmt='Q{}'),
+] + OVERLAYS)
+
+LIVE_BASKETBALL = Layout('live basketball', _teams(30) + SCORES + [
+    Text(FONT_SMALL, 64, 19, 'clock', align='center'),
+    Text(FONT_SMALL, 61, 12, 'period'),
+] + OVERLAYS)
+
+FINAL = Layout('final', _teams(30) + SCORES + [
+    Text(FONT_SMALL, 64, 19, text='FINAL', align='center'),
+] + OVERLAYS)
+
+NO_GAMES = Layout('no games', [
+    Text(FONT_BANNER, 64, 14, text='NO GAMES', align='center'),
+    Text(FONT_BANNER, 64, 28, text='TODAY!', align='center'),
+])
+
+# live games sharing the screen at once; one row each
+MULTI_GAME_MAX = 4
+
+
+# split screen for count live games: a row of away, score, home, score,
+# period and clock per game in the small font, scores in yellow while the
+# game's change is being highlighted and a red dot in the gap between the
+# home score and the period while its data is out of date
+def _multi(count):
+    step = PANEL_SIZE[1] // count
+    baseline = (step - 8) // 2 + 7
+    return Layout(f'{count} live games', [Rows('games', step, [
+        Text(FONT_SMALL, 0, baseline, 'away_abbreviation', color='away_color'),
+        Text(FONT_SMALL, 38, baseline, 'away_score', color='score_color', align='right'),
+        Text(FONT_SMALL, 42, baseline, 'home_abbreviation', color='home_color'),
+        Text(FONT_SMALL, 80, baseline, 'home_score', color='score_color', align='right'),
+        Text(FONT_SMALL, 84, baseline, 'period'),
+        Text(FONT_SMALL, 128, baseline, 'clock', align='right'),
+        Dots([(82, baseline - 6)], STALE, when='stale'),
+    ])])
+
+
+MULTI_LIVE = {count: _multi(count) for count in range(2, MULTI_GAME_MAX + 1)}
+
+SCREENS = [PREGAME, LIVE_FOOTBALL, LIVE_BASKETBALL, FINAL, NO_GAMES] + list(MULTI_LIVE.values())
+
+# live layout by sport; everything else is drawn like basketball
+LIVE_LAYOUTS = {'nfl': LIVE_FOOTBALL}
+
+
+def live_layout(game):
+    return LIVE_LAYOUTS.get(game['sport'], LIVE_BASKETBALL)
+
+
+def _score_values(game, clock, highlight):
+    values = {'highlight': highlight,
+              'stale': bool(game.get('stale')),
+              'clock': game.get('clock', '') if clock is None else clock,
+              'period': game.get('period')}
+    for side in ('away', 'home'):
+        values[side + '_abbreviation'] = game[side + '_abbreviation']
+        values[side + '_score'] = game.get(side + '_score')
+        # situation.possession holds the ESPN id of the team with the ball;
+        # that team's abbreviation is yellow
+        has_ball = game.get('possession') is not None and game.get('possession') == game.get(side + '_id')
+        values[side + '_color'] = POSSESSION if has_ball else WHITE
+    return values
+
+
+def game_values(game, clock=None, highlight=False):
+    # the fields the single game layouts draw
+    values = _score_values(game, clock, highlight)
+    for side in ('away', 'home'):
+        logo = logo_cache.ready(game[side + '_logo'])
+        values[side + '_logo'] = logo if logo is not None else placeholder(game[side + '_abbreviation'], game[side + '_color'])
+    if game.get('time'):
+        values['start'], values['meridiem'] = game['time'].strftime('%I:%M %p').split(' ')
+    return values
+
+
+def multi_values(games, clocks, flashing=(), highlight=False):
+    # the fields of the split screen for games; clocks maps game id to the
+    # clock text, flashing holds the ids of games being highlighted
+    rows = []
+    for game in games:
+        row = _score_values(game, clocks.get(game['id']), False)
+        if game['sport'] == 'nfl' and row['period'] is not None:
+            row['period'] = f"Q{row['period']}"
+        row['score_color'] = HIGHLIGHT if highlight and game['id'] in flashing else WHITE
+        rows.append(row)
+    return {'games': rows}
@@ -0,0 +1,91 @@
+from PIL import Image
+from sports_display.parse import Game
+import hashlib
+import json
+import logging
+import os
+import time
+
+
+SNAPSHOT_DIR = '/tmp/sports_snapshot'
+SNAPSHOT_FILE = 'snapshot.json'
+FRAME_FILE = 'frame.png'
+
+# a snapshot older than this is not worth showing after a restart
+MAX_AGE = 12 * 60 * 60
+
+
+class Snapshot:
+    # the last screen published before a restart: its mode, the games and
+    # their decoded logos (url -> image), and the last frame drawn (or None)
+
+    def __init__(self, mode, games, logos, frame, saved):
+        self.mode = mode
+        self.games = games
+        self.logos = logos
+        self.frame = frame
+        self.saved = saved
+
+
+def _logo_file(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest() + '.png'
+
+
+def _save_image(image, path):
+    # written next to the target and moved over it, so a restart mid-write
+    # never finds half an image
+    image.save(path + '.tmp', format='PNG')
+    os.replace(path + '.tmp', path)
+
+
+def save_snapshot(mode, games, logos, frame=None, directory=SNAPSHOT_DIR):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        files = {}
+        for url, image in logos.items():
+            files[url] = _logo_file(url)
+            path = os.path.join(directory, files[url])
+            # logos don't change under the same url
+            if not os.path.exists(path):
+                _save_image(image, path)
+        if frame is not None:
+            _save_image(frame, os.path.join(directory, FRAME_FILE))
+        path = os.path.join(directory, SNAPSHOT_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'saved': time.time(),
+                       'mode': mode,
+                       'games': [game.to_json() for game in games],
+                       'logos': files,
+                       'frame': FRAME_FILE if frame is not None else None}, f)
+        os.replace(path + '.tmp', path)
+        # logos of games that are no longer shown
+        for name in os.listdir(directory):
+            if name.endswith('.png') and name != FRAME_FILE and name not in files.values():
+                os.remove(os.path.join(directory, name))
+    except OSError as e:
+        logging.warning(f"Could not save snapshot: {e}")
+
+
+def load_snapshot(directory=SNAPSHOT_DIR, max_age=MAX_AGE):
+    # the last snapshot, or None if it is missing, unreadable or too old; a
+    # logo or frame that can't be read is left out
+    try:
+        with open(os.path.join(directory, SNAPSHOT_FILE), 'r') as f:
+            data = json.load(f)
+        if time.time() - data['saved'] > max_age:
+            return None
+        games = [Game.from_json(game) for game in data['games']]
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return None
+
+    images = {}
+    for url, name in list(data.get('logos', {}).items()) + [(None, data.get('frame'))]:
+        if name is None:
+            continue
+        try:
+            with Image.open(os.path.join(directory, name)) as image:
+                images[url] = image.convert("RGB")
+        except OSError as e:
+            logging.warning(f"Could not read {name} from the snapshot: {e}")
+    frame = images.pop(None, None)
+    return Snapshot(data['mode'], games, images, frame, data['saved'])
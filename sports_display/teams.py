@@ -0,0 +1,160 @@
+import json
+import logging
+import threading
+import time
+from sports_display import client
+from sports_display.leagues import LEAGUE_URLS
+
+
+CATALOG_FILE = '/tmp/sports_catalog_{}.json'
+
+# team lists barely change during a season, refresh them once a day
+CATALOG_TTL = 24 * 60 * 60
+# after a failed refresh, wait this long before trying the endpoint again
+CATALOG_RETRY = 5 * 60
+# a team ESPN puts in no conference is asked about again after this long
+GROUP_RETRY = 24 * 60 * 60
+
+_lock = threading.Lock()
+# sport -> {'fetched', 'teams', 'names'}
+_catalogs = {}
+# sports whose catalog is being refreshed in the background
+_refreshing = set()
+
+
+def _parse_catalog(payload):
+    teams = {}
+    for league in payload['sports'][0]['leagues']:
+        for entry in league['teams']:
+            team = entry['team']
+            logos = team.get('logos') or [{}]
+            teams[team['id']] = {'id': team['id'],
+                                 'name': team['displayName'],
+                                 'location': team.get('location'),
+                                 'nickname': team.get('name'),
+                                 'abbreviation': team.get('abbreviation'),
+                                 'color': team.get('color'),
+                                 'logo': logos[0].get('href')}
+    return teams
+
+
+def _read_disk(sport):
+    try:
+        with open(CATALOG_FILE.format(sport), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_disk(sport, cached):
+    try:
+        with open(CATALOG_FILE.format(sport), 'w') as f:
+            json.dump(cached, f)
+    except OSError as e:
+        logging.warning(f"Could not save {sport} team catalog: {e}")
+
+
+def _index(fetched, teams):
+    names = {team['name'].lower(): team_id for team_id, team in teams.items()}
+    return {'fetched': fetched, 'teams': teams, 'names': names}
+
+
+def _cached(sport):
+    # the catalog in memory or on disk, however old, or None; call with _lock held
+    cached = _catalogs.get(sport)
+    if cached is None:
+        on_disk = _read_disk(sport)
+        if on_disk is not None:
+            cached = _index(on_disk['fetched'], on_disk['teams'])
+            _catalogs[sport] = cached
+    return cached
+
+
+def get_catalog(sport):
+    # team id -> team info for a league, from memory, disk or the teams endpoint
+    with _lock:
+        cached = _cached(sport)
+        if cached is not None and time.time() - cached['fetched'] < CATALOG_TTL:
+            return cached['teams']
+
+    try:
+        response = client.get(LEAGUE_URLS[sport] + '/teams', params={'limit': 1000})
+        response.raise_for_status()
+        teams = _parse_catalog(response.json())
+    except Exception as e:
+        logging.warning(f"Could not load {sport} team catalog: {e}")
+        teams = cached['teams'] if cached is not None else {}
+        with _lock:
+            _catalogs[sport] = _index(time.time() - CATALOG_TTL + CATALOG_RETRY, teams)
+        return teams
+
+    fetched = time.time()
+    with _lock:
+        _catalogs[sport] = _index(fetched, teams)
+    _write_disk(sport, {'fetched': fetched, 'teams': teams})
+    return teams
+
+
+def team_group(sport, team_id):
+    # ESPN group (conference) id for a team, looked up once and kept in the catalog
+    catalog = get_catalog(sport)
+    with _lock:
+        team = catalog.get(team_id)
+        if team is None:
+            return None
+        # 'group_checked' is when ESPN last had no group for the team
+        if team.get('group') is not None or time.time() - team.get('group_checked', 0) < GROUP_RETRY:
+            return team.get('group')
+
+    response = client.get(LEAGUE_URLS[sport] + '/teams/' + team_id)
+    response.raise_for_status()
+    group = response.json()['team'].get('groups', {}).get('id')
+    with _lock:
+        team['group'] = group
+        if group is None:
+            team['group_checked'] = time.time()
+        cached = _catalogs.get(sport)
+        teams = {key: dict(value) for key, value in cached['teams'].items()} if cached is not None else None
+    if teams is not None:
+        _write_disk(sport, {'fetched': cached['fetched'], 'teams': teams})
+    return group
+
+
+def resolve_teams(sport, teams):
+    # configured teams may be ESPN ids or display names; names resolve to ids
+    # through the catalog, anything unresolved is kept as an exact display name
+    catalog = get_catalog(sport)
+    with _lock:
+        names = _catalogs[sport]['names'] if sport in _catalogs else {}
+    wanted = set()
+    for team in teams:
+        if team in catalog:
+            wanted.add(team)
+        elif team.lower() in names:
+            wanted.add(names[team.lower()])
+        else:
+            logging.warning(f"Team '{team}' not found in {sport} catalog; matching by name.")
+            wanted.add(team)
+    return wanted
+
+
+def _refresh(sport):
+    try:
+        get_catalog(sport)
+    finally:
+        with _lock:
+            _refreshing.discard(sport)
+
+
+def team_options(sport):
+    # (id, name) pairs sorted by name for the web form. Never waits on ESPN:
+    # a missing or expired catalog is refreshed on a background thread and
+    # the form gets what memory or disk holds meanwhile, empty at first
+    with _lock:
+        cached = _cached(sport)
+        if (cached is None or time.time() - cached['fetched'] >= CATALOG_TTL) and sport not in _refreshing:
+            _refreshing.add(sport)
+            threading.Thread(target=_refresh, args=(sport,), daemon=True).start()
+        teams = dict(cached['teams']) if cached is not None else {}
+    return sorted(((team_id, team['name']) for team_id, team in teams.items()),
+                  key=lambda option: option[1])
@@ -0,0 +1,171 @@
+import sys
+import os
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import time as dt_time
+from unittest import mock
+import unittest
+
+# sports_display.app draws through the rpi-rgb-led-matrix bindings; the
+# panel itself is replaced by FakeMatrix below
+try:
+    import rgbmatrix
+except ImportError:
+    rgbmatrix = None
+if rgbmatrix is not None:
+    from sports_display import app
+    from sports_display.parse import Game
+    from sports_display.screens import PREGAME, FINAL, LIVE_BASKETBALL
+    from sports_display.snapshot import Snapshot
+
+
+class FakeTime:
+    # clock, sleep and wake for both loops; waiting moves the clock forward
+
+    def __init__(self):
+        self.now = 1000.0
+
+
+    def clock(self):
+        return self.now
+
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+    def wake(self, seconds):
+        if seconds is not None:
+            self.now += seconds
+        return False
+
+
+class FakeCanvas:
+
+    def Clear(self):
+        pass
+
+
+    def SetImage(self, image, x, y):
+        pass
+
+
+    def SetPixel(self, x, y, r, g, b):
+        pass
+
+
+class FakeMatrix:
+
+    def CreateFrameCanvas(self):
+        return FakeCanvas()
+
+
+    def SwapOnVSync(self, canvas):
+        return canvas
+
+
+def game(game_id, status, clock='0:00', sport='nba', home_score='50'):
+    return Game(id=game_id, sport=sport, name=f'Game {game_id}', time=dt_time(19, 30), status=status,
+                clock=clock, period=2, stale=False,
+                home_id='15', home_abbreviation='MIL', home_score=home_score, home_color='00471b', home_logo=None,
+                away_id='2', away_abbreviation='BOS', away_score='48', away_color='008348', away_logo=None)
+
+
+@unittest.skipIf(rgbmatrix is None, "needs the rpi-rgb-led-matrix bindings")
+class SportsDisplayStepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.time = FakeTime()
+        self.display = app.SportsDisplay([], [], [], [], [], clock=self.time.clock, sleep=self.time.sleep,
+                                         wake=self.time.wake, matrix=FakeMatrix())
+        # the render loop waits on its feed between deadlines
+        self.display.feed.wait = self.time.wake
+        # (layout, values) of every frame instead of pixels
+        self.rendered = []
+        self.display._render = lambda layout, values: self.rendered.append((layout, values))
+
+
+    def test_rotates_through_not_live_games(self):
+        self.display.feed.put({'mode': 'not live',
+                               'games': [game('1', 'STATUS_SCHEDULED'), game('2', 'STATUS_FINAL')]})
+        start = self.time.now
+        self.display.step()
+        self.assertIs(self.rendered[-1][0], PREGAME)
+        self.assertEqual(self.time.now - start, app.ROTATE_SLOT)
+        self.display.step()
+        self.assertIs(self.rendered[-1][0], FINAL)
+        self.display.step()
+        self.assertIs(self.rendered[-1][0], PREGAME)
+        self.assertEqual(len(self.rendered), 3)
+
+
+    def test_ticks_the_live_clock(self):
+        first = game('1', 'STATUS_IN_PROGRESS', '10:00')
+        second = game('1', 'STATUS_IN_PROGRESS', '9:59')
+        # two polls with the clock moving start it running locally
+        self.display.clocks.sync(first)
+        self.display.clocks.sync(second)
+        self.display.feed.put({'mode': 'live', 'games': [second]})
+        self.display.step()
+        self.assertIs(self.rendered[-1][0], LIVE_BASKETBALL)
+        self.assertEqual(self.rendered[-1][1]['clock'], '9:59')
+        # the loop slept one CLOCK_TICK, then the tick redraws the clock
+        start = self.time.now
+        self.display.step()
+        self.assertEqual(self.rendered[-1][1]['clock'], '9:58')
+        self.assertEqual(self.time.now - start, app.CLOCK_TICK)
+
+
+    def test_retries_after_a_failed_draw(self):
+        failures = [RuntimeError("panel went away")]
+
+        def render(layout, values):
+            if failures:
+                raise failures.pop()
+            self.rendered.append((layout, values))
+        self.display._render = render
+
+        self.display.feed.put({'mode': 'not live', 'games': [game('1', 'STATUS_SCHEDULED')]})
+        start = self.time.now
+        with self.assertLogs(level='ERROR'):
+            self.display.step()
+        self.assertEqual(self.rendered, [])
+        self.assertEqual(self.time.now - start, app.ERROR_RETRY_DELAY)
+        self.display.step()
+        self.assertIs(self.rendered[-1][0], PREGAME)
+
+
+    def test_flash_keeps_the_clock_ticking(self):
+        self.display.clocks.sync(game('1', 'STATUS_IN_PROGRESS', '10:00'))
+        self.display.clocks.sync(game('1', 'STATUS_IN_PROGRESS', '9:59'))
+        self.display.feed.put({'mode': 'live', 'games': [game('1', 'STATUS_IN_PROGRESS', '9:59')]})
+        self.display.step()
+        start = self.time.now
+        self.display.feed.put({'mode': 'live', 'games': [game('1', 'STATUS_IN_PROGRESS', '9:59', home_score='52')]})
+        self.display.step()
+        self.assertTrue(self.rendered[-1][1]['highlight'])
+        # the render loop only waited for the next blink or tick
+        self.assertLessEqual(self.time.now - start, app.HIGHLIGHT_BLINK)
+        while self.time.now - start < app.HIGHLIGHT_SECONDS + app.HIGHLIGHT_BLINK:
+            self.display.step()
+        clocks = {values['clock'] for layout, values in self.rendered}
+        self.assertGreater(len(clocks), 2)
+        self.assertFalse(self.rendered[-1][1]['highlight'])
+        self.assertIsNone(self.display.deadlines.remaining('blink'))
+
+
+    def test_no_flash_for_changes_while_down(self):
+        snapshot = Snapshot('live', [game('1', 'STATUS_IN_PROGRESS', '9:59')], {}, None, 0)
+        with mock.patch.object(app, 'load_snapshot', return_value=snapshot):
+            self.display.warm_start()
+        self.display.step()
+        self.display.feed.put({'mode': 'live', 'games': [game('1', 'STATUS_IN_PROGRESS', '5:00', home_score='60')]})
+        self.display.step()
+        self.assertEqual(self.rendered[-1][1]['home_score'], '60')
+        self.assertFalse(any(values['highlight'] for layout, values in self.rendered))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sports_display.ingest import PushInbox
+from sports_display.parse import Game
+from datetime import time as dt_time
+import unittest
+
+
+def game(game_id='401', home_score='50'):
+    return Game(id=game_id, sport='nba', name='BOS @ MIL', time=dt_time(19, 30), status='STATUS_IN_PROGRESS',
+                clock='4:12', period=2, stale=True, possession='15',
+                home_id='15', home_abbreviation='MIL', home_score=home_score, home_color='00471b', home_logo=None,
+                away_id='2', away_abbreviation='BOS', away_score='48', away_color='008348', away_logo=None)
+
+
+class PushInboxTest(unittest.TestCase):
+
+    def setUp(self):
+        self.inbox = PushInbox()
+
+
+    def test_applies_pushable_fields_to_tracked_games(self):
+        self.inbox.put([{'id': 401, 'sport': 'nba', 'home_score': 52, 'name': 'renamed'}])
+        tracked = game()
+        self.assertEqual(self.inbox.apply([tracked]), [tracked])
+        # scores are kept as strings like ESPN's, other fields are ignored
+        self.assertEqual(tracked['home_score'], '52')
+        self.assertEqual(tracked['name'], 'BOS @ MIL')
+        self.assertFalse(tracked['stale'])
+
+
+    def test_keeps_pushes_for_untracked_games(self):
+        self.inbox.put([{'id': '402', 'sport': 'nba', 'clock': '1:00'}])
+        self.assertEqual(self.inbox.apply([game()]), [])
+        later = game('402')
+        self.assertEqual(self.inbox.apply([later]), [later])
+        self.assertEqual(later['clock'], '1:00')
+
+
+    def test_rejects_malformed_updates(self):
+        for update in ({'sport': 'nba'},
+                       {'id': True, 'sport': 'nba'},
+                       {'id': '401', 'sport': 'nba', 'clock': {'display': '1:00'}},
+                       {'id': '401', 'sport': 'nba', 'period': False}):
+            with self.assertRaises(ValueError):
+                self.inbox.put([update])
+
+
+    def test_rejects_null_for_drawn_fields(self):
+        for key in ('status', 'clock', 'period', 'home_score', 'away_score'):
+            with self.assertRaises(ValueError):
+                self.inbox.put([{'id': '401', 'sport': 'nba', key: None}])
+        self.assertEqual(self.inbox.apply([game()]), [])
+
+
+    def test_null_clears_possession(self):
+        self.inbox.put([{'id': '401', 'sport': 'nba', 'possession': None}])
+        tracked = game()
+        self.inbox.apply([tracked])
+        self.assertIsNone(tracked['possession'])
+
+
+    def test_hold_keeps_a_push_over_a_lagging_poll(self):
+        self.inbox.put([{'id': '401', 'sport': 'nba', 'home_score': '52'}])
+        tracked = game()
+        self.inbox.apply([tracked])
+        # the scoreboard hasn't caught up yet
+        tracked['home_score'] = '50'
+        self.inbox.hold([tracked])
+        self.assertEqual(tracked['home_score'], '52')
+
+
+if __name__ == '__main__':
+    unittest.main()
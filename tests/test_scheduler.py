@@ -0,0 +1,96 @@
+import sys
+import os
+
+# Add parent directory to sys.path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sports_display.scheduler import Deadlines
+import unittest
+
+
+class FakeTime:
+    # clock and sleep for Deadlines; sleeping moves the clock forward
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+
+    def clock(self):
+        return self.now
+
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class DeadlinesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.time = FakeTime()
+        self.deadlines = Deadlines(self.time.clock, self.time.sleep)
+
+
+    def test_due_after_its_seconds(self):
+        self.deadlines.set('rotate', 30)
+        self.assertFalse(self.deadlines.due('rotate'))
+        self.assertEqual(self.deadlines.remaining('rotate'), 30)
+        self.time.now += 30
+        self.assertTrue(self.deadlines.due('rotate'))
+        self.assertEqual(self.deadlines.remaining('rotate'), 0)
+
+
+    def test_set_replaces_and_clamps(self):
+        self.deadlines.set('tick', 10)
+        self.deadlines.set('tick', -5)
+        self.assertTrue(self.deadlines.due('tick'))
+
+
+    def test_cancel_and_clear(self):
+        self.deadlines.set('rotate', 1)
+        self.deadlines.set('tick', 1)
+        self.deadlines.cancel('rotate')
+        self.assertIsNone(self.deadlines.remaining('rotate'))
+        self.deadlines.clear()
+        self.assertIsNone(self.deadlines.until_next())
+        self.assertFalse(self.deadlines.due('tick'))
+
+
+    def test_until_next_is_the_earliest(self):
+        self.deadlines.set('rotate', 30)
+        self.deadlines.set('tick', 1)
+        self.assertEqual(self.deadlines.until_next(), 1)
+
+
+    def test_wait_sleeps_until_the_next_deadline(self):
+        self.deadlines.set('rotate', 30)
+        self.deadlines.set('tick', 1)
+        self.deadlines.wait()
+        self.assertEqual(self.time.slept, [1])
+        self.assertTrue(self.deadlines.due('tick'))
+
+
+    def test_wait_returns_at_once_when_something_is_due(self):
+        self.deadlines.set('tick', 0)
+        self.assertFalse(self.deadlines.wait())
+        self.assertEqual(self.time.slept, [])
+
+
+    def test_wait_hands_the_sleep_to_wake(self):
+        woken = []
+        self.deadlines.set('poll', 15)
+        self.assertTrue(self.deadlines.wait(lambda seconds: woken.append(seconds) or True))
+        self.assertEqual(woken, [15])
+        self.assertEqual(self.time.slept, [])
+
+
+    def test_wait_with_nothing_scheduled(self):
+        self.assertFalse(self.deadlines.wait())
+        woken = []
+        self.deadlines.wait(woken.append)
+        self.assertEqual(woken, [None])
+
+
+if __name__ == '__main__':
+    unittest.main()